@@ -1,3 +1,25 @@
 WORDS_LIMIT = 15
 CARDS_LIMIT_FOR_PAGE = 10
 SYMBOL_LIMIT_IN_MODELS = 256
+FEED_COUNT_TIMEOUT = 60
+FEED_COUNT_EXACT_LIMIT = 10_000
+FEED_TALLY_TIMEOUT = 60 * 60
+PAGE_RANGE_ON_EACH_SIDE = 3
+PAGE_RANGE_ON_ENDS = 1
+FEED_NUMBERED_PAGES_LIMIT = 100
+EXCERPT_WORDS_LIMIT = 10
+COMMENTS_LIMIT_FOR_PAGE = 20
+REFERENCE_CHECK_INTERVAL = 1
+REFERENCE_DATA_TIMEOUT = 60
+PAGE_CACHE_TIMEOUT = 60 * 5
+PUBLIC_CACHE_MAX_AGE = 60
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60
+PAGE_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_WAIT_INTERVAL = 0.05
+PAGE_CACHE_EARLY_EXPIRY_BETA = 1.0
+HOT_CACHE_TIMEOUT = 60 * 10
+HOT_CACHE_LOCAL_TIMEOUT = 30
+HOT_CACHE_MAX_ENTRIES = 1000
+HOT_CACHE_CHECK_INTERVAL = 1
+STREAM_JINJA2_BUFFER_SIZE = 20
+CARD_CACHE_TIMEOUT = 60 * 60
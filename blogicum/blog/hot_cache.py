@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from . import constants
+from .versions import new_version, repeat_after_commit
+
+
+def _shared_key(key):
+    return f'hot:{key}'
+
+
+def _version_key(key):
+    return f'hot-version:{key}'
+
+
+class TwoTierCache:
+    """Горячие объекты: LRU в памяти процесса перед общим кешем.
+
+    Первый уровень ограничен HOT_CACHE_MAX_ENTRIES записями и хранит
+    каждую не дольше HOT_CACHE_LOCAL_TIMEOUT секунд, второй — общий для
+    всех процессов кеш `default`. У каждого ключа своя версия в общем
+    кеше, и значение хранится вместе с версией, под которой его начали
+    загружать. Удаление ключа меняет его версию: общий уровень перестаёт
+    отдавать старое значение сразу, а первый уровень других процессов
+    сверяет версию ключа не реже раза в HOT_CACHE_CHECK_INTERVAL секунд.
+    """
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _current_version(self, key):
+        return cache.get_or_set(_version_key(key), new_version, None)
+
+    def _get_local(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            expires_at, checked_at, version, value = item
+            if expires_at <= now:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+        if now - checked_at < constants.HOT_CACHE_CHECK_INTERVAL:
+            return value
+        if cache.get(_version_key(key)) != version:
+            with self._lock:
+                self._local.pop(key, None)
+            return None
+        with self._lock:
+            if key in self._local:
+                self._local[key] = (expires_at, now, version, value)
+        return value
+
+    def _set_local(self, key, version, value):
+        now = time.monotonic()
+        expires_at = now + constants.HOT_CACHE_LOCAL_TIMEOUT
+        with self._lock:
+            self._local[key] = (expires_at, now, version, value)
+            self._local.move_to_end(key)
+            while len(self._local) > constants.HOT_CACHE_MAX_ENTRIES:
+                self._local.popitem(last=False)
+
+    def get(self, key):
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        shared = cache.get_many([_shared_key(key), _version_key(key)])
+        entry = shared.get(_shared_key(key))
+        version = shared.get(_version_key(key))
+        if entry is None or version is None or entry[0] != version:
+            return None
+        self._set_local(key, version, entry[1])
+        return entry[1]
+
+    def _store(self, key, version, value):
+        cache.set(
+            _shared_key(key), (version, value), constants.HOT_CACHE_TIMEOUT
+        )
+        self._set_local(key, version, value)
+
+    def set(self, key, value):
+        self._store(key, self._current_version(key), value)
+
+    def get_or_load(self, key, load):
+        """Значение из кеша или из load(); None не кешируется.
+
+        Версия ключа читается до load(), поэтому значение, загруженное
+        во время удаления ключа, сохраняется под старой версией
+        и никому не отдаётся.
+        """
+        value = self.get(key)
+        if value is None:
+            version = self._current_version(key)
+            value = load()
+            if value is not None:
+                self._store(key, version, value)
+        return value
+
+    def _invalidate(self, keys):
+        cache.set_many(
+            {_version_key(key): new_version() for key in keys}, None
+        )
+        cache.delete_many([_shared_key(key) for key in keys])
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def delete_many(self, keys):
+        """Удаляет ключи сразу и ещё раз после фиксации транзакции."""
+        keys = list(keys)
+        if keys:
+            repeat_after_commit(self._invalidate, keys)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+
+hot_cache = TwoTierCache()
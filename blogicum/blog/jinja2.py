@@ -0,0 +1,80 @@
+"""Окружение Jinja2 для шаблонов из каталога jinja2/.
+
+Глобальные функции и фильтры повторяют теги и фильтры Django, которыми
+пользуются шаблоны блога, поэтому Jinja-версии выводят ту же страницу.
+Движок подключается к представлению настройкой JINJA2_VIEWS.
+"""
+from django.core.cache.utils import make_template_fragment_key
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import formats
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import (
+    bootstrap_button, bootstrap_css, bootstrap_form
+)
+from jinja2 import Environment
+from markupsafe import Markup
+
+from .constants import CARD_CACHE_TIMEOUT
+from .templatetags.post_cards import fragment_cache
+
+# Формат дат карточек и страницы поста: «06 марта 1991, 21:23».
+DATETIME_FORMAT = 'd E Y, H:i'
+
+
+def url(view_name, *args, **kwargs):
+    """{% url %}: url('blog:post_detail', post.id)."""
+    return reverse(view_name, args=args, kwargs=kwargs)
+
+
+def date(value, arg=DATETIME_FORMAT):
+    """Фильтр date Django со временем в часовом поясе страницы."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def localize(value):
+    """Значение так, как Django выводит {{ value }} без фильтров."""
+    return formats.localize(template_localtime(value))
+
+
+def truncatewords(value, length):
+    return defaultfilters.truncatewords(value, length)
+
+
+def linebreaksbr(value):
+    return defaultfilters.linebreaksbr(value, autoescape=True)
+
+
+def cache(expire_time, fragment_name, *vary_on, caller):
+    """{% cache %} для блока {% call %} с теми же ключами фрагментов.
+
+        {% call cache(3600, 'post_card', post.id) %}...{% endcall %}
+    """
+    fragments = fragment_cache()
+    key = make_template_fragment_key(fragment_name, vary_on)
+    value = fragments.get(key)
+    if value is None:
+        value = str(caller())
+        fragments.set(key, value, expire_time)
+    return Markup(value)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'cache': cache,
+        'CARD_CACHE_TIMEOUT': CARD_CACHE_TIMEOUT,
+        'bootstrap_css': bootstrap_css,
+        'bootstrap_button': bootstrap_button,
+        'bootstrap_form': bootstrap_form,
+    })
+    env.filters.update({
+        'date': date,
+        'localize': localize,
+        'truncatewords': truncatewords,
+        'linebreaksbr': linebreaksbr,
+    })
+    return env
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post, make_excerpt
+from blog.page_cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = 'Заполняет Post.excerpt для уже существующих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов загружать и сохранять за раз.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                    'text', 'excerpt', 'updated_at'
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    post.updated_at = timezone.now()
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ['excerpt', 'updated_at'])
+            invalidate_tags(*(f'post:{post.pk}' for post in changed))
+            updated += len(changed)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов: {updated}.'
+        ))
@@ -0,0 +1,109 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет БД тестовыми постами и выводит EXPLAIN QUERY PLAN '
+        'запросов лент без индексов Post и с ними. Все изменения '
+        'откатываются по завершении.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            category, author = self.fill(options)
+            querysets = self.feed_querysets(category, author)
+
+            # Контекстный менеджер schema_editor() на SQLite нельзя
+            # открыть внутри транзакции, поэтому DDL выполняется напрямую.
+            editor = connection.schema_editor()
+            with connection.cursor() as cursor:
+                self.stdout.write(self.style.MIGRATE_HEADING('Без индексов'))
+                for index in Post._meta.indexes:
+                    cursor.execute(
+                        f'DROP INDEX {editor.quote_name(index.name)}'
+                    )
+                self.report(querysets)
+
+                self.stdout.write(self.style.MIGRATE_HEADING('С индексами'))
+                for index in Post._meta.indexes:
+                    cursor.execute(str(index.create_sql(Post, editor)))
+                cursor.execute('ANALYZE')
+                self.report(querysets)
+
+            transaction.set_rollback(True)
+
+    def fill(self, options):
+        self.stdout.write(f'Создаём {options["posts"]} постов...')
+        User.objects.bulk_create(
+            User(username=f'bench_author_{i}')
+            for i in range(options['authors'])
+        )
+        Category.objects.bulk_create(
+            Category(
+                title=f'Категория {i}',
+                slug=f'bench-category-{i}',
+                is_published=i % 10 != 0,
+            )
+            for i in range(options['categories'])
+        )
+        # bulk_create на SQLite не возвращает pk.
+        authors = list(User.objects.filter(username__startswith='bench_'))
+        categories = list(
+            Category.objects.filter(slug__startswith='bench-category-')
+        )
+
+        now = timezone.now()
+        batch = []
+        for i in range(options['posts']):
+            batch.append(Post(
+                title=f'Пост {i}',
+                text='Текст',
+                pub_date=now - timedelta(minutes=i - 1000),
+                is_published=i % 20 != 0,
+                author=random.choice(authors),
+                category=random.choice(categories),
+            ))
+            if len(batch) == BATCH_SIZE:
+                Post.objects.bulk_create(batch)
+                batch = []
+        Post.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return categories[1], authors[0]
+
+    def feed_querysets(self, category, author):
+        posts = Post.objects.for_cards().order_by('-pub_date', '-id')
+        return {
+            'index': posts.published(),
+            'category_posts': posts.published().filter(category=category),
+            'profile (владелец)': posts.filter(author=author),
+            'profile (гость)': posts.filter(author=author).published(),
+        }
+
+    def report(self, querysets):
+        for name, queryset in querysets.items():
+            page = queryset[:10]
+            start = time.perf_counter()
+            list(page)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(f'{name}: {elapsed:.1f} мс')
+            self.stdout.write(page.explain())
+            self.stdout.write('')
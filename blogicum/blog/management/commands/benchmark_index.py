@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.management.prod_settings import import_prod_settings
+from blogicum.settings import dev
+
+
+def profiles():
+    """Сравниваются DEBUG, шаблоны и middleware.
+
+    Постоянные соединения с БД так не замерить: тестовый клиент
+    не закрывает соединение после запроса.
+    """
+    return (('dev', dev), ('prod', import_prod_settings()))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа blog:index с настройками шаблонов '
+        'и middleware профилей dev и prod.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+
+    def measure(self, url, requests, warmup):
+        client = Client()
+        # Cookie сессии отключает кеш страниц для анонимов: замеряется
+        # сборка страницы, а не чтение готового ответа из кеша.
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'benchmark'
+        for _ in range(warmup):
+            client.get(url)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return (
+            statistics.median(timings),
+            timings[int(len(timings) * 0.95) - 1],
+        )
+
+    def handle(self, *args, **options):
+        url = reverse('blog:index')
+        results = {}
+        for name, profile in profiles():
+            missing_apps = set(profile.INSTALLED_APPS) - set(
+                settings.INSTALLED_APPS
+            )
+            if missing_apps:
+                self.stdout.write(
+                    f'{name}: пропущен, не установлены '
+                    f'{", ".join(sorted(missing_apps))}; '
+                    'запустите с BLOGICUM_ENV=dev.'
+                )
+                continue
+            with override_settings(
+                DEBUG=profile.DEBUG,
+                TEMPLATES=profile.TEMPLATES,
+                MIDDLEWARE=profile.MIDDLEWARE,
+                ALLOWED_HOSTS=['testserver'],
+            ):
+                median, p95 = self.measure(
+                    url, options['requests'], options['warmup']
+                )
+            results[name] = median
+            self.stdout.write(
+                f'{name}: медиана {median * 1000:.2f} мс, '
+                f'p95 {p95 * 1000:.2f} мс'
+            )
+        if len(results) == 2:
+            self.stdout.write(self.style.SUCCESS(
+                f'prod быстрее dev в {results["dev"] / results["prod"]:.1f} '
+                'раза.'
+            ))
@@ -0,0 +1,74 @@
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.template.loader import get_template
+
+from blog import constants
+from blog.paginators import FeedPaginator
+
+# Прежняя версия includes/paginator.html: ссылка на каждую страницу.
+FULL_RANGE_TEMPLATE = '''
+{% for i in page_obj.paginator.page_range %}
+  {% if page_obj.number == i %}
+    <li class="page-item active">
+      <span class="page-link">{{ i }}</span>
+    </li>
+  {% else %}
+    <li class="page-item">
+      <a class="page-link" href="?page={{ i }}">{{ i }}</a>
+    </li>
+  {% endif %}
+{% endfor %}
+'''
+
+
+class StubFeed:
+    """Лента заданной длины без обращения к БД."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return [
+            SimpleNamespace(id=i, pub_date=datetime.now(timezone.utc))
+            for i in range(*index.indices(self.size))
+        ]
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время рендеринга includes/paginator.html.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10, 1_000, 100_000]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        elided = get_template('includes/paginator.html')
+        full_range = Template(FULL_RANGE_TEMPLATE)
+        per_page = constants.CARDS_LIMIT_FOR_PAGE
+        for pages in options['pages']:
+            paginator = FeedPaginator(StubFeed(pages * per_page), per_page)
+            page_obj = paginator.get_page(pages // 2)
+            for name, render in (
+                ('все страницы', lambda: full_range.render(
+                    Context({'page_obj': page_obj})
+                )),
+                ('с пропусками', lambda: elided.render(
+                    {'page_obj': page_obj}
+                )),
+            ):
+                elapsed = min(timeit.repeat(
+                    render, number=1, repeat=options['repeat']
+                ))
+                self.stdout.write(
+                    f'{pages} стр., {name}: {elapsed * 1000:.2f} мс, '
+                    f'{len(render())} символов'
+                )
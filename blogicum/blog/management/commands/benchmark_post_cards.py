@@ -0,0 +1,105 @@
+import itertools
+import timeit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+from django.test import override_settings
+
+from blog.constants import CARDS_LIMIT_FOR_PAGE
+from blog.models import Category, Location, Post
+from blog.page_cache import stamp_cards
+
+User = get_user_model()
+
+TEMPLATES = {
+    'include': (
+        '{% for post in page_obj %}<article class="mb-5">'
+        '{% include "includes/post_card.html" %}</article>{% endfor %}'
+    ),
+    'post_cards': (
+        '{% load post_cards %}{% post_cards page_obj %}<article class="mb-5">'
+        '{{ card }}</article>{% endpost_cards %}'
+    ),
+}
+
+# Фрагменты карточек кладутся в отдельный кеш в памяти, чтобы замер
+# не зависел от файлового кеша и не засорял его.
+FRAGMENTS_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'benchmark-post-cards',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендеринг страницы ленты через include карточки '
+        'в цикле, который не кеширует карточки, и через тег '
+        '{% post_cards %} с пустым и заполненным кешем фрагментов. '
+        'Все изменения в БД откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(
+            DEBUG=False,
+            CACHES={**settings.CACHES, 'template_fragments': FRAGMENTS_CACHE},
+        ):
+            posts = self.fill()
+            engine = engines['django']
+            for name, source in TEMPLATES.items():
+                page = engine.from_string(source)
+                cold = self.measure(page, posts, options, cold=True)
+                warm = self.measure(page, posts, options, cold=False)
+                self.stdout.write(
+                    f'{name}: без кеша фрагментов {cold * 1000:.2f} мс, '
+                    f'с кешем {warm * 1000:.2f} мс на страницу'
+                )
+            transaction.set_rollback(True)
+
+    def fill(self):
+        author = User.objects.create(username='bench_cards_author')
+        category = Category.objects.create(
+            title='Категория', slug='bench-cards', is_published=True
+        )
+        location = Location.objects.create(name='Место', is_published=True)
+        Post.objects.bulk_create(
+            Post(
+                title=f'Пост {i}',
+                text='Текст поста. ' * 20,
+                pub_date='2000-01-01 00:00Z',
+                author=author,
+                category=category,
+                location=location,
+            )
+            for i in range(CARDS_LIMIT_FOR_PAGE)
+        )
+        posts = list(Post.objects.for_cards().filter(author=author))
+        stamp_cards(posts)
+        return posts
+
+    def measure(self, page, posts, options, cold):
+        """Лучшее время рендеринга страницы из нескольких повторов.
+
+        Без кеша каждый рендеринг получает новые штампы карточек,
+        и все фрагменты строятся заново.
+        """
+        stamps = itertools.count()
+
+        def render():
+            if cold:
+                stamp = f'bench-{next(stamps)}'
+                for post in posts:
+                    post.card_stamp = stamp
+            page.render({'page_obj': posts})
+
+        render()
+        timings = timeit.repeat(
+            render, number=options['number'], repeat=options['repeat']
+        )
+        return min(timings) / options['number']
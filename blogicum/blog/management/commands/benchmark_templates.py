@@ -0,0 +1,100 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template import engines
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.constants import CARDS_LIMIT_FOR_PAGE, COMMENTS_LIMIT_FOR_PAGE
+from blog.management.prod_settings import import_prod_settings
+from blog.models import Category, Comment, Location, Post
+from blog.views import JINJA2_ENGINE
+
+User = get_user_model()
+
+JINJA2_VIEWS = ['blog:index', 'blog:profile', 'blog:post_detail']
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа ленты, страницы поста и профиля '
+        'с шаблонами Django и Jinja2. Все изменения в БД откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if JINJA2_ENGINE not in {engine.name for engine in engines.all()}:
+            raise CommandError('Движок Jinja2 не настроен: установите Jinja2.')
+        with transaction.atomic():
+            post = self.fill()
+            urls = {
+                'index': reverse('blog:index'),
+                'profile': reverse('blog:profile', args=[post.author]),
+                'post_detail': reverse('blog:post_detail', args=[post.id]),
+            }
+            # Шаблоны Django, как и в prod, берутся из кеша загрузчика.
+            with override_settings(
+                DEBUG=False,
+                TEMPLATES=import_prod_settings().TEMPLATES,
+                ALLOWED_HOSTS=['testserver'],
+            ):
+                for name, url in urls.items():
+                    timings = {}
+                    for engine, views in (
+                        ('django', []), ('jinja2', JINJA2_VIEWS)
+                    ):
+                        with override_settings(JINJA2_VIEWS=views):
+                            timings[engine] = self.measure(
+                                url, options['requests'], options['warmup']
+                            )
+                    self.stdout.write(
+                        f'{name}: django {timings["django"] * 1000:.2f} мс, '
+                        f'jinja2 {timings["jinja2"] * 1000:.2f} мс, '
+                        f'в {timings["django"] / timings["jinja2"]:.1f} раза'
+                    )
+            transaction.set_rollback(True)
+
+    def fill(self):
+        author = User.objects.create(username='bench_templates_author')
+        category = Category.objects.create(
+            title='Категория', slug='bench-templates', is_published=True
+        )
+        location = Location.objects.create(name='Место', is_published=True)
+        Post.objects.bulk_create(
+            Post(
+                title=f'Пост {i}',
+                text='Текст поста.\n' * 20,
+                excerpt='Текст поста.',
+                pub_date='2000-01-01 00:00Z',
+                author=author,
+                category=category,
+                location=location,
+            )
+            for i in range(CARDS_LIMIT_FOR_PAGE + 1)
+        )
+        post = Post.objects.filter(author=author).first()
+        Comment.objects.bulk_create(
+            Comment(post=post, author=author, text=f'Комментарий {i}')
+            for i in range(COMMENTS_LIMIT_FOR_PAGE + 1)
+        )
+        return post
+
+    def measure(self, url, requests, warmup):
+        """Медиана времени ответа; cookie сессии отключает кеш страниц."""
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'benchmark'
+        for _ in range(warmup):
+            client.get(url)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
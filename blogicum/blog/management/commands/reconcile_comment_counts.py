@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.page_cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Post.comment_count с реальным числом комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько постов проверять за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        actual_count = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+                'post'
+            ).annotate(total=Count('pk')).values('total')
+        ), 0)
+
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            chunk = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                    'pk', flat=True
+                )[:chunk_size]
+            )
+            if not chunk:
+                break
+            # Каждая порция обновляется в своей короткой транзакции,
+            # чтобы не держать блокировку на всю таблицу.
+            with transaction.atomic():
+                drifted = list(
+                    Post.objects.filter(
+                        pk__gte=chunk[0], pk__lte=chunk[-1]
+                    ).annotate(actual=actual_count).exclude(
+                        comment_count=F('actual')
+                    ).values_list('pk', flat=True)
+                )
+                if drifted:
+                    Post.objects.filter(pk__in=drifted).update(
+                        comment_count=actual_count, updated_at=timezone.now()
+                    )
+                    invalidate_tags(*(f'post:{pk}' for pk in drifted))
+            checked += len(chunk)
+            fixed += len(drifted)
+            last_pk = chunk[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {checked}, исправлено: {fixed}.'
+        ))
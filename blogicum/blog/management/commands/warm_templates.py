@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует шаблоны из templates/, разрешает маршруты '
+        'и загружает справочники.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = warm_up()
+        elapsed = time.perf_counter() - started
+        references = 'загружены' if result['references'] else 'пропущены'
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов: {result["templates"]}, маршрутов: {result["urls"]}, '
+            f'справочники {references}; {elapsed * 1000:.0f} мс.'
+        ))
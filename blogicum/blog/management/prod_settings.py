@@ -0,0 +1,17 @@
+import importlib
+import os
+from unittest import mock
+
+from django.conf import settings
+
+
+def import_prod_settings():
+    """Модуль профиля prod для сравнения с текущими настройками.
+
+    Без DJANGO_SECRET_KEY профиль не импортируется, поэтому на время
+    импорта подставляется ключ текущих настроек; в окружении процесса
+    он не остаётся.
+    """
+    secret_key = os.environ.get('DJANGO_SECRET_KEY', settings.SECRET_KEY)
+    with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': secret_key}):
+        return importlib.import_module('blogicum.settings.prod')
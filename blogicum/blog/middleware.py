@@ -0,0 +1,22 @@
+from .purge import SURROGATE_KEY_HEADER
+
+
+class CacheTagsMiddleware:
+    """Собирает теги, отмеченные представлением, в заголовок Surrogate-Key.
+
+    По этому заголовку обратный прокси связывает закешированную страницу
+    с постами, категориями и авторами на ней, а сигналы затем сбрасывают
+    её через blog.purge.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.cache_tags = set()
+        response = self.get_response(request)
+        if request.cache_tags and SURROGATE_KEY_HEADER not in response:
+            response[SURROGATE_KEY_HEADER] = ' '.join(
+                sorted(request.cache_tags)
+            )
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-17 12:40
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_created_at(apps, schema_editor):
+    """Комментариям без даты добавления ставится время миграции."""
+    Comment = apps.get_model('blog', 'Comment')
+    Comment.objects.filter(created_at__isnull=True).update(
+        created_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_created=True, auto_now_add=True, verbose_name='Добавлено'),
+        ),
+    ]
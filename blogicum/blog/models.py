@@ -1,11 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from blog.constants import SYMBOL_LIMIT_IN_MODELS
+from blog.constants import EXCERPT_WORDS_LIMIT, SYMBOL_LIMIT_IN_MODELS
 
 User = get_user_model()
 
 
+def make_excerpt(text):
+    """Анонс поста так же, как фильтр truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS_LIMIT, truncate=' …')
+
+
 class BaseModel(models.Model):
     is_published = models.BooleanField(
         'Опубликовано',
@@ -58,12 +65,46 @@ class Location(BaseModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    @staticmethod
+    def _published_filter():
+        return models.Q(
+            pub_date__lt=timezone.now(),
+            is_published=True,
+            category__is_published=True,
+        )
+
+    def published(self):
+        """Посты, доступные всем: опубликованные в открытой категории."""
+        return self.filter(self._published_filter())
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(
+            self._published_filter() | models.Q(author=user)
+        )
+
+    def for_cards(self):
+        """Только колонки, которые выводит includes/post_card.html.
+
+        Категория и местоположение берутся из реестра справочников.
+        """
+        return self.select_related('author').only(
+            'title', 'excerpt', 'pub_date', 'image', 'is_published',
+            'comment_count', 'category', 'location',
+            'author__username',
+        )
+
+
 class Post(BaseModel):
     title = models.CharField(
         'Заголовок',
         max_length=SYMBOL_LIMIT_IN_MODELS
     )
     text = models.TextField('Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в '
@@ -94,14 +135,77 @@ class Post(BaseModel):
         upload_to='posts_images',
         blank=True,
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            # Django передаёт в SQLite условие is_published=True как
+            # `WHERE "is_published"` без сравнения, поэтому булево поле
+            # не может быть ведущей колонкой индекса: оно вынесено
+            # в условие частичного индекса.
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_published=True),
+                name='post_published_date_idx',
+            ),
+            models.Index(
+                fields=['category', 'pub_date'],
+                condition=models.Q(is_published=True),
+                name='post_category_date_idx',
+            ),
+            # Автор видит в профиле и снятые с публикации посты.
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def category_ref(self):
+        """Категория из реестра справочников, без запроса к БД."""
+        from blog.registry import registry
+        return registry.category(self.category_id)
+
+    @property
+    def location_ref(self):
+        """Местоположение из реестра справочников, без запроса к БД."""
+        from blog.registry import registry
+        return registry.location(self.location_id)
+
+    def is_visible_to(self, user):
+        """То же условие, что у PostQuerySet.visible_to, без запроса к БД."""
+        if user.is_authenticated and self.author_id == user.id:
+            return True
+        category = self.category_ref
+        return (
+            self.is_published
+            and self.pub_date < timezone.now()
+            and category is not None
+            and category.is_published
+        )
+
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra_fields = {'updated_at'}
+            if 'text' in update_fields:
+                extra_fields.add('excerpt')
+            kwargs['update_fields'] = {*update_fields, *extra_fields}
+        super().save(*args, **kwargs)
+
 
 class Comment(BaseModel):
     post = models.ForeignKey(
@@ -117,10 +221,23 @@ class Comment(BaseModel):
         related_name='comments',
     )
     text = models.TextField('Текст комментария')
+    # Без NULL: по дате добавления листаются комментарии поста.
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_created=True,
+        auto_now_add=True
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            # Комментарии на странице поста в порядке добавления.
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text
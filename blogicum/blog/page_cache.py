@@ -0,0 +1,325 @@
+import hashlib
+import math
+import random
+import time
+from collections import namedtuple
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import force_bytes
+from django.utils.http import parse_http_date_safe
+from django.views.decorators.http import condition
+
+from . import constants
+from .hot_cache import hot_cache
+from .paginators import decode_cursor
+from .purge import purge_tags
+from .versions import new_version, repeat_after_commit
+
+FEED_TAG = 'feed'
+
+# Параметры запроса, с которыми страница ещё кешируется: номер
+# и курсоры страницы ленты.
+PAGE_PARAMS = ('page', 'after', 'before')
+
+# Заголовки, которые сохраняются вместе с закешированной страницей.
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def post_tags(post):
+    """Теги страницы, на которой выводится карточка поста.
+
+    У поста без категории или местоположения соответствующего тега нет.
+    """
+    tags = {f'post:{post.id}', f'author:{post.author_id}'}
+    if post.category_id is not None:
+        tags.add(f'category:{post.category_id}')
+    if post.location_id is not None:
+        tags.add(f'location:{post.location_id}')
+    return tags
+
+
+def add_cache_tags(request, *tags):
+    """Отмечает, от каких данных зависит кешируемый ответ.
+
+    Для страницы, которую кеширует cache_anonymous_page, версия тега
+    запоминается, как только тег встретился впервые, — до того как
+    представление прочитает данные под ним. С этими версиями страница
+    и попадает в кеш, поэтому изменение во время рендеринга делает её
+    устаревшей, а не прячется под новой версией.
+    """
+    cache_tags = getattr(request, 'cache_tags', None)
+    if cache_tags is not None:
+        cache_tags.update(tags)
+    versions = getattr(request, 'cache_tag_versions', None)
+    if versions is not None:
+        new_tags = [tag for tag in tags if tag not in versions]
+        if new_tags:
+            versions.update(_start_versions(new_tags))
+
+
+def _tag_key(tag):
+    return f'tag-version:{tag}'
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов; у отсутствующих в кеше версии нет."""
+    versions = cache.get_many([_tag_key(tag) for tag in tags])
+    return {tag: versions.get(_tag_key(tag)) for tag in tags}
+
+
+def invalidate_tags(*tags):
+    """Сбрасывает все закешированные страницы с любым из тегов.
+
+    Локальный кеш сбрасывается сразу, кеш обратного прокси — через
+    бэкенд из CACHE_PURGE_BACKEND. Горячие объекты хранятся под ключами,
+    совпадающими с тегами, и удаляются вместе с ними. Версии тегов
+    меняются ещё раз после фиксации транзакции: страница, построенная
+    до неё из старых данных, не должна остаться под новой версией.
+    """
+    purge_tags(tags)
+    hot_cache.delete_many(tags)
+    repeat_after_commit(_bump_tag_versions, tags)
+
+
+def _bump_tag_versions(tags):
+    cache.set_many({_tag_key(tag): new_version() for tag in tags}, None)
+
+
+def _start_versions(tags):
+    """Версии тегов; отсутствующим в кеше присваивается начальная."""
+    versions = get_tag_versions(tags)
+    missing = [tag for tag, version in versions.items() if version is None]
+    if missing:
+        for tag in missing:
+            cache.add(_tag_key(tag), new_version(), None)
+        versions.update(get_tag_versions(missing))
+    return versions
+
+
+def stamp_cards(posts):
+    """Проставляет постам card_stamp — ключ версии кеша их карточек.
+
+    Штамп собран из версий тегов поста, его автора, категории
+    и местоположения, поэтому меняется вместе с любым из них, включая
+    число комментариев.
+    """
+    tags_by_post = {post.id: sorted(post_tags(post)) for post in posts}
+    versions = _start_versions(set().union(*tags_by_post.values()))
+    for post in posts:
+        post.card_stamp = '.'.join(
+            str(versions[tag]) for tag in tags_by_post[post.id]
+        )
+
+
+class PageEntry(namedtuple(
+    'PageEntry', 'content headers versions fresh_until duration'
+)):
+    """Закешированная страница.
+
+    fresh_until — момент, до которого запись свежая; после него она
+    ещё PAGE_CACHE_STALE_TIMEOUT секунд может отдаваться как устаревшая.
+    duration — сколько секунд страница строилась, для раннего обновления.
+    """
+
+    def is_current(self):
+        return get_tag_versions(self.versions) == self.versions
+
+    def is_fresh(self, now):
+        """Свежа ли запись с учётом вероятностного раннего истечения.
+
+        Чем ближе fresh_until и чем дороже страница, тем вероятнее, что
+        очередной запрос сочтёт запись истёкшей и обновит её заранее,
+        пока остальные ещё получают её из кеша (алгоритм XFetch).
+        """
+        early = (
+            self.duration * constants.PAGE_CACHE_EARLY_EXPIRY_BETA
+            * -math.log(1.0 - random.random())
+        )
+        return now + early < self.fresh_until and self.is_current()
+
+    def to_response(self, request):
+        add_cache_tags(request, *self.versions)
+        response = HttpResponse(self.content)
+        for header, value in self.headers.items():
+            response[header] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
+
+
+def page_key(path, page='', after='', before=''):
+    signature = f'{path}?page={page}&after={after}&before={before}'
+    return f'page:{hashlib.md5(force_bytes(signature)).hexdigest()}'
+
+
+def _wait_for_entry(key, lock_key):
+    """Ждёт, пока страницу построит запрос, взявший блокировку."""
+    deadline = time.monotonic() + constants.PAGE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(constants.PAGE_CACHE_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry.is_current():
+            return entry
+        if cache.get(lock_key) is None:
+            break
+    return None
+
+
+def _is_cacheable(request):
+    return (
+        request.method == 'GET'
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not set(request.GET) - set(PAGE_PARAMS)
+    )
+
+
+def _page_params(request):
+    """Разобранные PAGE_PARAMS для ключа кеша.
+
+    Ключ строится из номера и курсоров, а не из исходных строк, и для
+    неразборчивых значений страница не кешируется вовсе, чтобы
+    произвольные строки в запросе не плодили записи в кеше.
+    """
+    params = {}
+    page = request.GET.get('page')
+    if page:
+        try:
+            params['page'] = int(page)
+        except ValueError:
+            return None
+    for name in ('after', 'before'):
+        token = request.GET.get(name)
+        if token:
+            params[name] = decode_cursor(token)
+            if params[name] is None:
+                return None
+    return params
+
+
+def _store_page(key, request, response, started, content):
+    finished = time.time()
+    cache.set(
+        key,
+        PageEntry(
+            content,
+            {
+                header: response[header]
+                for header in STORED_HEADERS if header in response
+            },
+            request.cache_tag_versions,
+            finished + constants.PAGE_CACHE_TIMEOUT,
+            finished - started,
+        ),
+        constants.PAGE_CACHE_TIMEOUT + constants.PAGE_CACHE_STALE_TIMEOUT,
+    )
+
+
+def _store_when_streamed(chunks, store):
+    """Отдаёт поток и кеширует страницу, когда он передан целиком."""
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    store(b''.join(content))
+
+
+def _store_response(key, request, response, started):
+    """Кеширует ответ представления; потоковый — когда передан целиком.
+
+    Версии тегов берутся те, что запомнены до рендеринга, поэтому
+    изменение данных, пока поток идёт к клиенту, делает запись устаревшей.
+    """
+    store = partial(_store_page, key, request, response, started)
+    if not response.streaming:
+        store(response.content)
+        return
+    response.streaming_content = _store_when_streamed(
+        response.streaming_content, store
+    )
+
+
+def cache_anonymous_page(view):
+    """Кеширует страницу для анонимных GET-запросов по пути и PAGE_PARAMS.
+
+    Анонимным считается запрос без cookie сессии: сама сессия не читается,
+    чтобы ответ не получил `Vary: Cookie`. Запись хранит версии тегов,
+    запомненные add_cache_tags() до чтения данных, и устаревает, как
+    только версия любого из них изменилась или истёк PAGE_CACHE_TIMEOUT.
+    Вместе со страницей хранятся её валидаторы, поэтому и из кеша
+    на условный запрос отдаётся 304. Потоковый ответ попадает в кеш,
+    когда передан клиенту целиком, но блокировка снимается сразу после
+    возврата из представления, а не после медленной отдачи потока.
+
+    Устаревшую страницу перестраивает один запрос, взявший блокировку
+    в кеше, а остальные тем временем получают старую версию. Если
+    страницы в кеше нет совсем, они ждут её не дольше
+    PAGE_CACHE_LOCK_TIMEOUT секунд.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        params = _page_params(request) if _is_cacheable(request) else None
+        if params is None:
+            return view(request, *args, **kwargs)
+
+        key = page_key(request.path, **params)
+        lock_key = f'{key}:lock'
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh(time.time()):
+            return entry.to_response(request)
+
+        locked = cache.add(lock_key, 1, constants.PAGE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if entry is None:
+                entry = _wait_for_entry(key, lock_key)
+            if entry is not None:
+                return entry.to_response(request)
+
+        try:
+            request.cache_tag_versions = {}
+            started = time.time()
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                _store_response(key, request, response, started)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        return response
+
+    return wrapper
+
+
+def make_etag(*parts):
+    """ETag из значений, которые однозначно определяют страницу."""
+    return hashlib.md5(force_bytes(repr(parts))).hexdigest()
+
+
+def conditional_page(get_validators):
+    """Отвечает 304 по If-None-Match / If-Modified-Since до запуска view.
+
+    get_validators(request, *args, **kwargs) возвращает пару
+    (etag, last_modified) из дешёвых запросов, не строя саму страницу,
+    или (None, None), если валидаторов нет и решать должно представление.
+    Пара считается один раз на запрос.
+    """
+
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_page_validators'):
+            request._page_validators = get_validators(
+                request, *args, **kwargs
+            )
+        return request._page_validators
+
+    return condition(
+        etag_func=lambda *args, **kwargs: validators(*args, **kwargs)[0],
+        last_modified_func=(
+            lambda *args, **kwargs: validators(*args, **kwargs)[1]
+        ),
+    )
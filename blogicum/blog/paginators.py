@@ -0,0 +1,283 @@
+import binascii
+import hashlib
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Model
+from django.db.models.sql.where import AND, WhereNode
+from django.utils.encoding import force_bytes, force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from . import constants
+from .versions import new_version, repeat_after_commit
+
+FEED_ORDERING = ('-pub_date', '-id')
+FEED_COUNT_VERSION_KEY = 'feed-count-version'
+# Диапазон 64-битных целых, которые помещаются в колонку id.
+MIN_ID, MAX_ID = -2 ** 63, 2 ** 63 - 1
+# Поля, по которым поддерживается приблизительный подсчёт постов.
+TALLY_FIELDS = ('author', 'category', 'is_published')
+
+
+def encode_cursor(obj, key_field='pub_date') -> str:
+    """Непрозрачный токен позиции объекта в ленте."""
+    return urlsafe_base64_encode(
+        force_bytes(f'{getattr(obj, key_field).isoformat()}|{obj.id}')
+    )
+
+
+def decode_cursor(token):
+    """Разбирает токен в пару (дата, id) или возвращает None.
+
+    id вне диапазона целых чисел БД не принимается: запрос с ним упал бы
+    с OverflowError.
+    """
+    if not token:
+        return None
+    try:
+        value, pk = force_str(urlsafe_base64_decode(token)).split('|')
+        value, pk = datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError):
+        return None
+    if not MIN_ID <= pk <= MAX_ID:
+        return None
+    return value, pk
+
+
+def bump_feed_counts():
+    """Сбрасывает все закешированные количества постов в лентах."""
+    repeat_after_commit(_set_feed_count_version)
+
+
+def _set_feed_count_version():
+    cache.set(FEED_COUNT_VERSION_KEY, new_version(), None)
+
+
+class FeedCounter:
+    """Количество постов ленты с кешем по подписи фильтров.
+
+    Подпись строится по условиям WHERE queryset; значения сравнений
+    с датами в неё не входят, иначе из-за pub_date__lt=now кеш не совпадал
+    бы между запросами. Если постов больше FEED_COUNT_EXACT_LIMIT, точный
+    подсчёт заменяется оценкой по редко пересчитываемому числу постов
+    автора, категории или всей ленты.
+    """
+
+    @classmethod
+    def _describe(cls, node) -> str:
+        parts = []
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                parts.append(f'({cls._describe(child)})')
+                continue
+            value = child.rhs
+            if isinstance(value, datetime):
+                value = 'now'
+            elif isinstance(value, Model):
+                value = value.pk
+            parts.append(f'{child.lhs!r}__{child.lookup_name}={value}')
+        description = f' {node.connector} '.join(sorted(parts))
+        return f'NOT ({description})' if node.negated else description
+
+    @staticmethod
+    def _signature(description: str) -> str:
+        return hashlib.md5(force_bytes(description)).hexdigest()
+
+    @classmethod
+    def _tally_lookups(cls, node, model):
+        """Точные условия на поля самого поста, общие для всей выборки."""
+        if node.connector != AND or node.negated:
+            return
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                yield from cls._tally_lookups(child, model)
+            elif (
+                child.lookup_name == 'exact'
+                and child.lhs.target.model is model
+                and child.lhs.target.name in TALLY_FIELDS
+            ):
+                yield child.lhs.target.name, child.rhs
+
+    def count(self, queryset) -> int:
+        version = cache.get_or_set(
+            FEED_COUNT_VERSION_KEY, new_version, None
+        )
+        description = self._describe(queryset.query.where)
+        key = f'feed-count:{version}:{self._signature(description)}'
+        count = cache.get(key)
+        if count is None:
+            limit = constants.FEED_COUNT_EXACT_LIMIT
+            count = queryset.order_by()[:limit + 1].count()
+            if count > limit:
+                count = max(count, self.tally(queryset))
+            cache.set(key, count, constants.FEED_COUNT_TIMEOUT)
+        return count
+
+    def tally(self, queryset) -> int:
+        model = queryset.model
+        lookups = dict(self._tally_lookups(queryset.query.where, model))
+        description = '&'.join(
+            f'{name}={getattr(value, "pk", value)}'
+            for name, value in sorted(lookups.items())
+        )
+        return cache.get_or_set(
+            f'feed-tally:{self._signature(description)}',
+            lambda: model.objects.filter(**lookups).count(),
+            constants.FEED_TALLY_TIMEOUT,
+        )
+
+
+class FeedPage(Page):
+    """Страница с номером, умеющая отдавать курсоры соседних страниц."""
+
+    @property
+    def uses_cursors(self):
+        """Листается ли лента курсорами, а не номерами страниц.
+
+        Режим зависит только от размера ленты, поэтому на всех её
+        страницах ссылки одного вида.
+        """
+        return (
+            self.paginator.num_pages > constants.FEED_NUMBERED_PAGES_LIMIT
+        )
+
+    @cached_property
+    def page_range(self):
+        """Первая и последние страницы и окно вокруг текущей."""
+        return list(self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=constants.PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=constants.PAGE_RANGE_ON_ENDS,
+        ))
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self[len(self) - 1]) if self else ''
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor(self[0]) if self else ''
+
+
+class FeedPaginator(Paginator):
+    def __init__(self, object_list, per_page, counter=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        if self.counter is None:
+            return super().count
+        return self.counter.count(self.object_list)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage:
+    """Страница по ключу (дата, id) без COUNT и OFFSET."""
+
+    number = None
+    uses_cursors = True
+
+    def __init__(self, object_list, has_next, has_previous, key_field):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.key_field = key_field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self:
+            return ''
+        return encode_cursor(self.object_list[-1], self.key_field)
+
+    @property
+    def previous_cursor(self):
+        if not self:
+            return ''
+        return encode_cursor(self.object_list[0], self.key_field)
+
+
+class CursorPaginator:
+    """Пагинация по курсорам `?after=` и `?before=`.
+
+    Ожидает queryset, отсортированный по (key_field, id) в направлении
+    descending: посты ленты — от новых к старым, комментарии — наоборот.
+    """
+
+    def __init__(
+            self, object_list, per_page, key_field='pub_date',
+            descending=True
+    ):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.key_field = key_field
+        self.descending = descending
+
+    def _seek(self, items, cursor, forward):
+        value, pk = cursor
+        field = self.key_field
+        # Условие записано так, чтобы диапазон по key_field
+        # оставался индексируемым.
+        if forward != self.descending:
+            return items.filter(**{f'{field}__gte': value}).exclude(
+                **{field: value, 'id__lte': pk}
+            )
+        return items.filter(**{f'{field}__lte': value}).exclude(
+            **{field: value, 'id__gte': pk}
+        )
+
+    def get_page(self, after=None, before=None) -> CursorPage:
+        after, before = decode_cursor(after), decode_cursor(before)
+        items = self.object_list
+        if before:
+            items = self._seek(items, before, forward=False).reverse()
+        elif after:
+            items = self._seek(items, after, forward=True)
+
+        # Лишний объект показывает, есть ли ещё страница в том же
+        # направлении.
+        object_list = list(items[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if before:
+            object_list.reverse()
+            return CursorPage(object_list, True, has_more, self.key_field)
+        return CursorPage(object_list, has_more, bool(after), self.key_field)
+
+
+def paginate_feed(request, posts, per_page, counter=None):
+    """Номерная страница по `?page=` или курсорная по `?after=`/`?before=`.
+
+    Ленту не длиннее FEED_NUMBERED_PAGES_LIMIT страниц шаблон листает
+    номерами, более длинную — курсорами, начиная с первой страницы.
+    """
+    posts = posts.order_by(*FEED_ORDERING)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        return CursorPaginator(posts, per_page).get_page(after, before)
+    return FeedPaginator(posts, per_page, counter).get_page(
+        request.GET.get('page')
+    )
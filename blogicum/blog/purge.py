@@ -0,0 +1,84 @@
+import logging
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Заголовок с тегами ответа для обратного прокси (Varnish xkey, Fastly).
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+
+# Сброшенные теги для LocMemPurgeBackend, по образцу django.core.mail.outbox.
+outbox = []
+
+
+class BasePurgeBackend:
+    """Отправляет обратному прокси команду сбросить страницы по тегам."""
+
+    def purge(self, tags):
+        raise NotImplementedError
+
+
+class DummyPurgeBackend(BasePurgeBackend):
+    """Ничего не делает: прокси перед приложением нет."""
+
+    def purge(self, tags):
+        pass
+
+
+class LocMemPurgeBackend(BasePurgeBackend):
+    """Складывает наборы тегов в purge.outbox; нужен для тестов."""
+
+    def purge(self, tags):
+        outbox.append(set(tags))
+
+
+class FilePurgeBackend(BasePurgeBackend):
+    """Дописывает теги строкой в файл CACHE_PURGE_FILE_PATH."""
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path or settings.CACHE_PURGE_FILE_PATH
+
+    def purge(self, tags):
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            file.write(' '.join(sorted(tags)) + '\n')
+
+
+class HttpPurgeBackend(BasePurgeBackend):
+    """Отправляет PURGE с заголовком Surrogate-Key на адреса прокси.
+
+    Недоступный прокси не должен ломать сохранение контента, поэтому
+    ошибки только записываются в лог.
+    """
+
+    def __init__(self, urls=None, timeout=None):
+        self.urls = urls or settings.CACHE_PURGE_URLS
+        self.timeout = timeout or settings.CACHE_PURGE_TIMEOUT
+
+    def purge(self, tags):
+        keys = ' '.join(sorted(tags))
+        for url in self.urls:
+            request = urllib.request.Request(
+                url, method='PURGE', headers={SURROGATE_KEY_HEADER: keys}
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except (urllib.error.URLError, OSError) as error:
+                logger.warning('Не удалось сбросить кеш %s: %s', url, error)
+
+
+def get_purge_backend():
+    return import_string(settings.CACHE_PURGE_BACKEND)()
+
+
+def purge_tags(tags):
+    """Сбрасывает теги в прокси после фиксации текущей транзакции.
+
+    До фиксации прокси успел бы закешировать страницу со старыми данными.
+    """
+    tags = set(tags)
+    if tags:
+        transaction.on_commit(lambda: get_purge_backend().purge(tags))
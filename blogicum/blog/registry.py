@@ -0,0 +1,117 @@
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from . import constants
+from .versions import new_version, repeat_after_commit
+
+REFERENCE_VERSION_KEY = 'reference-data-version'
+
+CategoryRef = namedtuple(
+    'CategoryRef', 'id title description slug is_published'
+)
+LocationRef = namedtuple('LocationRef', 'id name is_published')
+
+
+class ReferenceRegistry:
+    """Категории и местоположения в памяти процесса.
+
+    Таблицы маленькие и меняются редко, поэтому загружаются целиком
+    в неизменяемые кортежи, которые процессы делят через общий кеш.
+    Изменения в текущем процессе сбрасывают
+    данные сразу; другие процессы замечают их по общему ключу версии
+    в кеше, который проверяется не чаще REFERENCE_CHECK_INTERVAL секунд.
+    Версия меняется ещё раз после фиксации транзакции, а сами данные
+    живут не дольше REFERENCE_DATA_TIMEOUT секунд: прочитанное внутри
+    транзакции, которую затем откатили, не задерживается надолго.
+    """
+
+    def __init__(self):
+        self._data = None
+        self._version = None
+        self._checked_at = 0
+        self._loaded_at = 0
+
+    def _load(self):
+        """Справочники из общего кеша, а при его промахе — из БД.
+
+        Данные кешируются под текущей версией, поэтому после изменения
+        справочников все процессы загружают их из БД один раз.
+        """
+        key = f'reference-data:{self._version}'
+        data = cache.get(key)
+        if data is None:
+            data = self._query()
+            cache.set(key, data, constants.REFERENCE_DATA_TIMEOUT)
+        return data
+
+    def _query(self):
+        from blog.models import Category, Location
+
+        categories = {
+            category.id: category for category in (
+                CategoryRef(*values) for values in
+                Category.objects.values_list(*CategoryRef._fields)
+            )
+        }
+        by_slug = {
+            category.slug: category for category in categories.values()
+        }
+        locations = {
+            location.id: location for location in (
+                LocationRef(*values) for values in
+                Location.objects.values_list(*LocationRef._fields)
+            )
+        }
+        return categories, by_slug, locations
+
+    def _get_data(self):
+        now = time.monotonic()
+        if now - self._checked_at >= constants.REFERENCE_CHECK_INTERVAL:
+            version = cache.get_or_set(
+                REFERENCE_VERSION_KEY, new_version, None
+            )
+            self._checked_at = now
+            if version != self._version:
+                self._data = None
+                self._version = version
+        data = self._data
+        if (
+            data is None
+            or now - self._loaded_at >= constants.REFERENCE_DATA_TIMEOUT
+        ):
+            # Данные подменяются целиком, поэтому потоки не видят
+            # частично обновлённое состояние.
+            data = self._data = self._load()
+            self._loaded_at = now
+        return data
+
+    def category(self, pk):
+        return self._get_data()[0].get(pk)
+
+    def category_by_slug(self, slug):
+        return self._get_data()[1].get(slug)
+
+    def location(self, pk):
+        return self._get_data()[2].get(pk)
+
+    @property
+    def version(self):
+        """Версия справочников; меняется при любом их изменении."""
+        self._get_data()
+        return self._version
+
+    def preload(self):
+        self._get_data()
+
+    def invalidate(self):
+        repeat_after_commit(self._bump_version)
+
+    def _bump_version(self):
+        self._data = None
+        self._checked_at = 0
+        cache.set(REFERENCE_VERSION_KEY, new_version(), None)
+
+
+registry = ReferenceRegistry()
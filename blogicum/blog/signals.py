@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from blog.page_cache import FEED_TAG, invalidate_tags, post_tags
+from blog.paginators import bump_feed_counts
+from blog.registry import registry
+
+User = get_user_model()
+
+# Поля, изменение которых меняет состав лент, а не только вид карточки.
+PLACEMENT_FIELDS = {
+    Post: ('category_id', 'is_published', 'pub_date'),
+    Category: ('is_published',),
+}
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    """Учитывает новый комментарий в счётчике поста.
+
+    Правка комментария тоже меняет время изменения поста: по нему
+    строятся валидаторы условных запросов страницы поста.
+    """
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Убирает удалённый комментарий из счётчика поста.
+
+    Срабатывает и при каскадном удалении, например вместе с автором.
+    """
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_feed_counts(sender, **kwargs):
+    """Сбрасывает количества постов в лентах после изменения контента."""
+    bump_feed_counts()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_reference_registry(sender, **kwargs):
+    """Перечитывает справочники после их изменения."""
+    registry.invalidate()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+def remember_placement(sender, instance, raw, **kwargs):
+    """Запоминает поля, от которых зависит состав лент, до сохранения."""
+    original = None
+    if instance.pk and not raw:
+        original = sender.objects.filter(pk=instance.pk).values(
+            *PLACEMENT_FIELDS[sender]
+        ).first()
+    instance._original_placement = original
+
+
+def placement_changed(instance):
+    original = getattr(instance, '_original_placement', None)
+    return original is None or any(
+        original[field] != getattr(instance, field)
+        for field in PLACEMENT_FIELDS[type(instance)]
+    )
+
+
+@receiver(post_save, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    """Сбрасывает страницы с постом, а при его перемещении — и ленты."""
+    tags = post_tags(instance)
+    if placement_changed(instance):
+        tags.add(FEED_TAG)
+        original = instance._original_placement or {}
+        if original.get('category_id') is not None:
+            tags.add(f'category:{original["category_id"]}')
+    invalidate_tags(*tags)
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post_pages(sender, instance, **kwargs):
+    invalidate_tags(FEED_TAG, *post_tags(instance))
+
+
+@receiver(post_save, sender=Comment)
+def purge_commented_post_pages(sender, instance, **kwargs):
+    """Обновляет число комментариев на карточке и их текст у поста."""
+    invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def purge_uncommented_post_pages(sender, instance, **kwargs):
+    invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Category)
+def purge_category_pages(sender, instance, **kwargs):
+    tags = {f'category:{instance.id}'}
+    if placement_changed(instance):
+        tags.add(FEED_TAG)
+    invalidate_tags(*tags)
+
+
+@receiver(post_delete, sender=Category)
+def purge_deleted_category_pages(sender, instance, **kwargs):
+    invalidate_tags(FEED_TAG, f'category:{instance.id}')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def purge_location_pages(sender, instance, **kwargs):
+    invalidate_tags(f'location:{instance.id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def purge_author_pages(sender, instance, update_fields=None, **kwargs):
+    """Обновляет имя автора на карточках; вход в систему не в счёт.
+
+    Его посты и посты, которые он комментировал, получают новое время
+    изменения, чтобы сменились и валидаторы условных запросов страниц
+    с ними, и удаляются из горячего кеша и кеша страниц.
+    """
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        post_ids = set()
+        if not kwargs.get('created'):
+            post_ids.update(Post.objects.filter(
+                author=instance
+            ).values_list('pk', flat=True))
+            post_ids.update(Comment.objects.filter(
+                author=instance
+            ).values_list('post_id', flat=True))
+            Post.objects.filter(pk__in=post_ids).update(
+                updated_at=timezone.now()
+            )
+        invalidate_tags(
+            f'author:{instance.id}', *(f'post:{pk}' for pk in post_ids)
+        )
@@ -0,0 +1,85 @@
+"""Потоковая отдача страниц лент.
+
+Страница уходит клиенту по частям: сначала <head> и шапка, затем
+карточки по мере рендеринга, поэтому браузер раньше получает ссылку
+на CSS, а процесс не держит в памяти HTML всей страницы.
+"""
+import re
+
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.template.backends.utils import csrf_input_lazy, csrf_token_lazy
+from django.template.base import Template as DjangoTemplate
+from django.utils.crypto import get_random_string
+
+from . import constants
+
+# Переменная контекста, в которую тег {% post_cards %} откладывает карточки.
+STREAM_CONTEXT_KEY = 'post_cards_stream'
+
+
+class CardStream:
+    """Карточки, которые выводятся после остальной страницы.
+
+    Тег {% post_cards %} оставляет в странице метку, а генератор своих
+    карточек отдаёт сюда; iter_content() выдаёт страницу, подставляя
+    на место меток карточки по одной.
+    """
+
+    def __init__(self):
+        self.token = get_random_string(16)
+        self.cards = {}
+
+    def add(self, cards):
+        marker = f'<!--{self.token}:{len(self.cards)}-->'
+        self.cards[marker] = cards
+        return marker
+
+    def iter_content(self, content):
+        if not self.cards:
+            yield content
+            return
+        markers = re.compile(
+            '(' + '|'.join(map(re.escape, self.cards)) + ')'
+        )
+        for part in markers.split(content):
+            if part in self.cards:
+                yield from self.cards[part]
+            elif part:
+                yield part
+
+
+def _django_chunks(template, context, request):
+    stream = CardStream()
+    content = template.render({**context, STREAM_CONTEXT_KEY: stream}, request)
+    return stream.iter_content(content)
+
+
+def _jinja2_chunks(template, context, request):
+    """Поток Jinja2 с тем же контекстом, что у Template.render() бэкенда."""
+    context = {
+        **context,
+        'request': request,
+        'csrf_input': csrf_input_lazy(request),
+        'csrf_token': csrf_token_lazy(request),
+    }
+    for processor in template.backend.template_context_processors:
+        context.update(processor(request))
+    chunks = template.template.stream(context)
+    chunks.enable_buffering(constants.STREAM_JINJA2_BUFFER_SIZE)
+    return chunks
+
+
+def stream_page(request, template_name, context, using=None):
+    """StreamingHttpResponse страницы вместо render().
+
+    Шаблон Django рендерится сразу, кроме карточек {% post_cards %},
+    которые строятся во время отдачи; шаблон Jinja2 целиком отдаётся
+    по мере рендеринга.
+    """
+    template = loader.get_template(template_name, using=using)
+    if isinstance(template.template, DjangoTemplate):
+        chunks = _django_chunks(template, context, request)
+    else:
+        chunks = _jinja2_chunks(template, context, request)
+    return StreamingHttpResponse(chunks)
@@ -0,0 +1,87 @@
+"""Тег {% post_cards %}: все карточки страницы ленты за один вызов.
+
+Шаблон карточки загружается один раз на страницу, а не в каждом
+{% include %} цикла, и её HTML кешируется фрагментами под теми же
+ключами, что и у {% cache %} Jinja-версии карточки. Фрагменты всех
+карточек читаются одним запросом к кешу и записываются одним.
+
+При потоковой отдаче (blog.streaming) тег выводит метку, а карточки
+строит уже во время отдачи ответа.
+"""
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.safestring import mark_safe
+
+from ..constants import CARD_CACHE_TIMEOUT
+from ..streaming import STREAM_CONTEXT_KEY
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_FRAGMENT = 'post_card'
+
+
+def fragment_cache():
+    """Кеш, в который {% cache %} без имени кеша кладёт фрагменты."""
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def card_key(post):
+    """Ключ фрагмента карточки; card_stamp проставляет stamp_cards()."""
+    return make_template_fragment_key(
+        CARD_FRAGMENT, [post.id, post.card_stamp]
+    )
+
+
+class PostCardsNode(template.Node):
+    def __init__(self, posts, nodelist):
+        self.posts = posts
+        self.nodelist = nodelist
+
+    def render(self, context):
+        posts = list(self.posts.resolve(context))
+        stream = context.get(STREAM_CONTEXT_KEY)
+        if stream is None:
+            return ''.join(self.iter_cards(context, posts))
+        # Карточки строятся при отдаче ответа, когда рендеринг страницы
+        # завершён, поэтому им нужна своя копия контекста.
+        detached = context.new(context.flatten())
+        return stream.add(self.iter_cards(detached, posts))
+
+    def iter_cards(self, context, posts):
+        card = context.template.engine.get_template(CARD_TEMPLATE)
+        fragments = fragment_cache()
+        keys = [card_key(post) for post in posts]
+        found = fragments.get_many(keys)
+        missing = {}
+        for post, key in zip(posts, keys):
+            with context.push(post=post):
+                html = found.get(key)
+                if html is None:
+                    html = missing[key] = card.render(context)
+                context['card'] = mark_safe(html)
+                yield self.nodelist.render(context)
+        if missing:
+            fragments.set_many(missing, CARD_CACHE_TIMEOUT)
+
+
+@register.tag
+def post_cards(parser, token):
+    """Выводит тело блока для каждого поста, подставляя карточку в {{ card }}.
+
+        {% post_cards page_obj %}
+          <article>{{ card }}</article>
+        {% endpost_cards %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает один аргумент — список постов.'
+        )
+    nodelist = parser.parse(('endpost_cards',))
+    parser.delete_first_token()
+    return PostCardsNode(parser.compile_filter(bits[1]), nodelist)
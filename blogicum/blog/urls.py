@@ -33,6 +33,11 @@ urlpatterns = [
         name='delete_post'
     ),
     # ----------- Comment paths -----------
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.CommentCreateView.as_view(),
@@ -0,0 +1,28 @@
+"""Версии данных в общем кеше."""
+import time
+from functools import partial
+
+from django.db import transaction
+
+
+def new_version():
+    """Значение ключа версии, которое не повторяет ни одно прежнее.
+
+    Общий кеш может вытеснить ключ версии. Счётчик, начатый заново с 1,
+    совпал бы с версиями старых записей, и те снова считались бы
+    актуальными. Время в наносекундах не повторяется, а версии
+    сравниваются только на равенство. Изменение версии — запись нового
+    значения, а не incr(), который в файловом кеше не атомарен.
+    """
+    return time.time_ns()
+
+
+def repeat_after_commit(change_version, *args):
+    """Меняет версию сейчас и ещё раз после фиксации текущей транзакции.
+
+    Процесс, прочитавший данные между первой сменой версии и фиксацией,
+    сохранил бы в кеше старое состояние уже под новой версией.
+    """
+    change_version(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(change_version, *args))
@@ -1,96 +1,265 @@
-import datetime as dt
 from typing import Any
 
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import get_user_model
-from django.core.paginator import Paginator, Page
+from django.core.paginator import Page
+from django.db.models import Max
 from django.urls import reverse_lazy
-from django.http import HttpResponse
-from django.utils import timezone
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import cache_control
 from django.views.generic.edit import (
     CreateView, UpdateView, DeleteView
 )
 
 from . import constants
 from blog.models import (
-    Post, Category, Comment
+    Post, Comment
 )
 from .forms import PostForm, CommentForm, ProfileForm
+from .page_cache import (
+    FEED_TAG, add_cache_tags, cache_anonymous_page, conditional_page,
+    get_tag_versions, make_etag, post_tags, stamp_cards
+)
+from .hot_cache import hot_cache
+from .registry import registry
+from .streaming import stream_page
+from .paginators import (
+    CursorPage, CursorPaginator, FeedCounter, paginate_feed
+)
 
 User = get_user_model()
 
+# Движок из settings.TEMPLATES с Jinja-версиями шаблонов блога.
+JINJA2_ENGINE = 'jinja2'
+
+# Поля пользователя, которые выводит шапка профиля.
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+
+
+def _view_name(request):
+    match = request.resolver_match
+    return match.view_name if match is not None else None
+
+
+def template_engine(request):
+    """Имя движка шаблонов для представления из JINJA2_VIEWS, иначе None."""
+    if _view_name(request) in settings.JINJA2_VIEWS:
+        return JINJA2_ENGINE
+    return None
 
-def get_page_obj(request: HttpResponse, filters) -> Page:
 
-    posts = Post.objects.select_related(
-        'category', 'location', 'author',
-    ).filter(filters).order_by('-pub_date')
+def render_feed(request, template, context):
+    """render() ленты; представления из STREAMING_VIEWS отдают поток."""
+    using = template_engine(request)
+    if _view_name(request) in settings.STREAMING_VIEWS:
+        return stream_page(request, template, context, using=using)
+    return render(request, template, context, using=using)
 
-    paginator = Paginator(posts, constants.CARDS_LIMIT_FOR_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+
+class TemplateEngineMixin:
+    """template_engine() для классов-представлений."""
+
+    @property
+    def template_engine(self):
+        return template_engine(self.request)
+
+
+def get_page_obj(request: HttpResponse, posts) -> Page:
+    page_obj = paginate_feed(
+        request, posts.for_cards(), constants.CARDS_LIMIT_FOR_PAGE,
+        FeedCounter(),
+    )
+    add_cache_tags(request, *set().union(*map(post_tags, page_obj)))
+    stamp_cards(page_obj)
     return page_obj
 
 
+def get_post(post_id):
+    """Пост с автором из горячего кеша; видимость проверяет вызывающий."""
+    return hot_cache.get_or_load(
+        f'post:{post_id}',
+        lambda: Post.objects.select_related('author').defer(
+            'author__password'
+        ).filter(pk=post_id).first(),
+    )
+
+
+def get_profile(username):
+    """Пользователь для шапки профиля из горячего кеша.
+
+    Шапка хранится по id автора, чтобы её сбрасывал тот же ключ
+    `author:<id>`, что и страницы с его постами; имя пользователя
+    лишь указывает на id и сверяется с шапкой после переименования.
+    """
+    id_key = f'profile-id:{username}'
+    profile_id = hot_cache.get_or_load(
+        id_key,
+        lambda: User.objects.filter(username=username).values_list(
+            'id', flat=True
+        ).first(),
+    )
+    if profile_id is None:
+        return None
+    profile = hot_cache.get_or_load(
+        f'author:{profile_id}',
+        lambda: User.objects.filter(pk=profile_id).only(
+            *PROFILE_FIELDS
+        ).first(),
+    )
+    if profile is not None and profile.username == username:
+        return profile
+    # Имя перешло к другому пользователю или автора переименовали.
+    hot_cache.delete_many([id_key])
+    return User.objects.filter(username=username).only(
+        *PROFILE_FIELDS
+    ).first()
+
+
+def get_comments_page(request: HttpResponse, post_id) -> CursorPage:
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).only(
+        'text', 'created_at', 'post', 'author__username',
+    ).order_by('created_at', 'id')
+    paginator = CursorPaginator(
+        comments, constants.COMMENTS_LIMIT_FOR_PAGE,
+        key_field='created_at', descending=False,
+    )
+    return paginator.get_page(after=request.GET.get('after'))
+
+
+def feed_validators(request, posts, tag, *extra):
+    """ETag страницы ленты одним агрегатным запросом; Last-Modified нет.
+
+    Время изменения ловит правки постов и их комментариев, дата самого
+    нового поста — наступление отложенной публикации, версия тега ленты
+    `tag`, которую сигналы меняют при удалении и снятии постов, — их
+    исчезновение, версия справочников — переименование и скрытие
+    категорий и местоположений. Кроме правок, ничто из этого не сдвигает
+    время изменения, поэтому Last-Modified ленты дал бы 304 клиентам,
+    которые шлют только If-Modified-Since, на уже изменившуюся страницу.
+    """
+    dates = posts.aggregate(
+        last_modified=Max('updated_at'), newest=Max('pub_date')
+    )
+    etag = make_etag(
+        request.get_full_path(), dates['last_modified'], dates['newest'],
+        get_tag_versions([tag])[tag], registry.version, *extra,
+    )
+    return etag, None
+
+
+def index_validators(request):
+    return feed_validators(request, Post.objects.published(), FEED_TAG)
+
+
+def category_validators(request, category_slug):
+    category = registry.category_by_slug(category_slug)
+    if category is None or not category.is_published:
+        return None, None
+    return feed_validators(
+        request, Post.objects.published().filter(category_id=category.id),
+        f'category:{category.id}',
+    )
+
+
+def profile_validators(request, username):
+    profile = get_profile(username)
+    if profile is None:
+        return None, None
+    posts = Post.objects.filter(author_id=profile.id)
+    is_owner = request.user.id == profile.id
+    if not is_owner:
+        posts = posts.published()
+    header = [getattr(profile, field) for field in PROFILE_FIELDS]
+    return feed_validators(
+        request, posts, f'author:{profile.id}', *header, is_owner
+    )
+
+
+def post_validators(request, id):
+    """ETag страницы поста; Last-Modified нет.
+
+    Правки поста, его комментариев и имён их авторов меняют updated_at,
+    а переименование и скрытие категории или местоположения — версию
+    справочников, которая в updated_at не отражается. В форме
+    комментария у вошедшего пользователя стоит CSRF-токен, который
+    меняется при каждом входе, поэтому его секрет тоже входит в ETag.
+    """
+    updated_at = Post.objects.visible_to(request.user).filter(
+        pk=id
+    ).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    etag = make_etag(
+        request.get_full_path(), updated_at, registry.version,
+        request.user.id, request.META.get('CSRF_COOKIE'),
+    )
+    return etag, None
+
+
+@cache_control(public=True, max_age=constants.PUBLIC_CACHE_MAX_AGE)
+@cache_anonymous_page
+@conditional_page(index_validators)
 def index(request):
     """Главная страница проекта со всеми постами."""
-    filters = Q(
-        pub_date__lt=timezone.now(),
-        is_published=True,
-        category__is_published=True,
-    )
-    page_obj = get_page_obj(request, filters)
+    add_cache_tags(request, FEED_TAG)
+    page_obj = get_page_obj(request, Post.objects.published())
 
     context = {'page_obj': page_obj}
     template = 'blog/index.html'
-    return render(request, template, context)
+    return render_feed(request, template, context)
 
 
+@cache_control(public=True, max_age=constants.PUBLIC_CACHE_MAX_AGE)
+@cache_anonymous_page
+@conditional_page(category_validators)
 def category_posts(request, category_slug):
     """Страница постов по категориям."""
-    category = get_object_or_404(
-        Category.objects.filter(is_published=True),
-        slug=category_slug
-    )
-    filters = Q(
-        pub_date__lt=timezone.now(),
-        category=category,
-        is_published=True,
+    category = registry.category_by_slug(category_slug)
+    if category is None or not category.is_published:
+        raise Http404
+    add_cache_tags(request, f'category:{category.id}')
+    page_obj = get_page_obj(
+        request, Post.objects.published().filter(category_id=category.id)
     )
-    page_obj = get_page_obj(request, filters)
 
     context = {
         'page_obj': page_obj,
         'category': category
     }
     template = 'blog/category.html'
-    return render(request, template, context)
+    return render_feed(request, template, context)
 
 
 # ------- User View -------
+@conditional_page(profile_validators)
 def user_profile(request, username):
     """Страница пользователя."""
     template = 'blog/profile.html'
-    profile = get_object_or_404(User, username=username)
+    profile = get_profile(username)
+    if profile is None:
+        raise Http404
 
-    filters = Q(author=profile)
+    add_cache_tags(request, f'author:{profile.id}')
+    posts = Post.objects.filter(author=profile)
     if request.user != profile:
-        filters &= Q(
-            pub_date__lt=dt.datetime.now(),
-            is_published=True,
-            category__is_published=True,
-        )
+        posts = posts.published()
 
-    page_obj = get_page_obj(request, filters)
+    page_obj = get_page_obj(request, posts)
     context = {
         'page_obj': page_obj,
         'profile': profile,
     }
-    return render(request, template, context)
+    return render_feed(request, template, context)
 
 
 @login_required
@@ -103,35 +272,53 @@ def edit_profile(request):
         return redirect('blog:profile', username=request.user)
     context = {'form': form}
 
-    return render(request, template, context)
+    return render(
+        request, template, context, using=template_engine(request)
+    )
 
 
 # ------- Post Views -------
+@conditional_page(post_validators)
 def post_detail(request, id):
     """Страница поста."""
     template = 'blog/detail.html'
-    filters = Q(
-        pub_date__lt=timezone.now(),
-        is_published=True,
-        category__is_published=True,
+    post = get_post(id)
+    if post is None or not post.is_visible_to(request.user):
+        raise Http404
+    add_cache_tags(request, *post_tags(post))
+    comments = get_comments_page(request, post.id)
+
+    form = CommentForm(data=request.POST or None)
+    context = {
+        'form': form,
+        'post': post,
+        'comments': comments,
+    }
+    response = render(
+        request, template, context, using=template_engine(request)
     )
     if request.user.is_authenticated:
-        filters = filters | Q(author=request.user)
+        patch_cache_control(response, private=True)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=constants.PUBLIC_CACHE_MAX_AGE
+        )
+    return response
+
 
+def post_comments(request, post_id):
+    """Следующая порция комментариев к посту для кнопки «Показать ещё»."""
+    template = 'includes/comment_list.html'
     post = get_object_or_404(
-        Post.objects.filter(filters).prefetch_related('comments'),
-        pk=id
+        Post.objects.visible_to(request.user).only('id'), pk=post_id
     )
-
-    comments = post.comments.all()
-
-    form = CommentForm(data=request.POST or None)
     context = {
-        'form': form,
         'post': post,
-        'comments': comments,
+        'comments': get_comments_page(request, post.id),
     }
-    return render(request, template, context)
+    return render(
+        request, template, context, using=template_engine(request)
+    )
 
 
 @login_required
@@ -148,7 +335,9 @@ def add_post(request):
         instance.save()
         return redirect('blog:profile', username=request.user)
     context = {'form': form}
-    return render(request, template, context)
+    return render(
+        request, template, context, using=template_engine(request)
+    )
 
 
 @login_required
@@ -166,21 +355,36 @@ def edit_post(request, post_id):
         return redirect('blog:post_detail', id=post_id)
 
     context = {'form': form}
-    return render(request, template, context)
+    return render(
+        request, template, context, using=template_engine(request)
+    )
 
 
 class IsAuthorMixin:
+    """Пускает к объекту только его автора.
+
+    Объект загружается один раз в dispatch() и отдаётся из кеша
+    при вызове get_object() в UpdateView и DeleteView.
+    """
     pk_url_kwarg = None
     model = None
 
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_author_object'):
+            instance = super().get_object(queryset)
+            if instance.author_id != self.request.user.id:
+                raise PermissionDenied
+            self._author_object = instance
+        return self._author_object
+
     def dispatch(self, request, *args: Any, **kwargs: Any) -> HttpResponse:
-        instance = get_object_or_404(self.model, pk=kwargs[self.pk_url_kwarg])
-        if instance.author != request.user:
-            raise PermissionDenied
+        self.get_object()
         return super().dispatch(request, *args, **kwargs)
 
 
-class PostDeleteView(LoginRequiredMixin, IsAuthorMixin, DeleteView):
+class PostDeleteView(
+        LoginRequiredMixin, TemplateEngineMixin, IsAuthorMixin, DeleteView
+):
     model = Post
     form_class = PostForm
     pk_url_kwarg = 'post_id'
@@ -191,7 +395,7 @@ class PostDeleteView(LoginRequiredMixin, IsAuthorMixin, DeleteView):
 
 
 # ------- Comment Views -------
-class BaseCommentMixin:
+class BaseCommentMixin(TemplateEngineMixin):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
@@ -206,11 +410,16 @@ class ChangeCommentMixin(BaseCommentMixin, IsAuthorMixin):
 
 
 class CommentCreateView(LoginRequiredMixin, BaseCommentMixin, CreateView):
+    @transaction.atomic
     def form_valid(self, form, **kwargs):
         post_id = self.kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
+        # Сам пост не нужен: достаточно убедиться, что он виден автору.
+        if not Post.objects.visible_to(self.request.user).filter(
+            pk=post_id
+        ).exists():
+            raise Http404
         form.instance.author = self.request.user
-        form.instance.post = post
+        form.instance.post_id = post_id
         return super().form_valid(form)
 
 
@@ -0,0 +1,77 @@
+import os
+
+from django.db import DatabaseError, connections
+from django.template import engines
+from django.urls import URLResolver, get_resolver
+
+from .registry import registry
+
+
+def template_names(engine):
+    """Имена всех шаблонов в каталогах DIRS движка, например templates/."""
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def compile_templates():
+    """Компилирует шаблоны проекта во всех движках.
+
+    С кешированным загрузчиком скомпилированные шаблоны остаются
+    в памяти процесса, и первый запрос к странице их уже не разбирает.
+    Возвращает число шаблонов.
+    """
+    compiled = 0
+    for engine in engines.all():
+        for name in template_names(engine):
+            engine.get_template(name)
+            compiled += 1
+    return compiled
+
+
+def resolve_urls(resolver=None):
+    """Компилирует регулярные выражения маршрутов и таблицы reverse().
+
+    Возвращает число маршрутов.
+    """
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    resolved = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            resolved += resolve_urls(pattern)
+        else:
+            resolved += 1
+    return resolved
+
+
+def preload_references():
+    """Загружает справочники; без БД, например до миграций, пропускает."""
+    try:
+        registry.preload()
+    except DatabaseError:
+        return False
+    return True
+
+
+def warm_up():
+    return {
+        'templates': compile_templates(),
+        'urls': resolve_urls(),
+        'references': preload_references(),
+    }
+
+
+def warm_up_server():
+    """Прогрев процесса, который будет обслуживать запросы.
+
+    Соединения с БД, открытые при загрузке справочников, закрываются:
+    с gunicorn --preload процесс затем форкается, и воркеры не должны
+    делить одно соединение.
+    """
+    warmed = warm_up()
+    connections.close_all()
+    return warmed
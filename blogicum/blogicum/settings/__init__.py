@@ -0,0 +1,12 @@
+"""Профиль настроек выбирается переменной окружения BLOGICUM_ENV.
+
+`dev` (по умолчанию) — отладка и debug_toolbar, `prod` — middleware
+без debug_toolbar, кешированные загрузчики шаблонов, постоянные
+соединения с БД и обязательный DJANGO_SECRET_KEY.
+"""
+import os
+
+if os.environ.get('BLOGICUM_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
@@ -1,13 +1,16 @@
+"""Общие настройки; профили dev и prod дополняют их."""
+import tempfile
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-vp5-q%6*v%zq$lq-3q3@8!=lzl+0xjc&ffu%15yj_#f_1&4wa4'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -27,12 +30,11 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'core.apps.CoreConfig',
-    'debug_toolbar',
     'django_bootstrap5',
 ]
 
+# Профиль dev добавляет в начало DebugToolbarMiddleware.
 MIDDLEWARE = [
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,10 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-INTERNAL_IPS = [
-    '127.0.0.1',
+    'blog.middleware.CacheTagsMiddleware',
 ]
 
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -51,6 +50,17 @@ MEDIA_ROOT = BASE_DIR / 'media'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Сброс кеша обратного прокси по тегам из заголовка Surrogate-Key.
+# Для Varnish или nginx укажите 'blog.purge.HttpPurgeBackend'.
+CACHE_PURGE_BACKEND = 'blog.purge.DummyPurgeBackend'
+CACHE_PURGE_URLS = ['http://127.0.0.1:6081/']
+CACHE_PURGE_TIMEOUT = 2
+CACHE_PURGE_FILE_PATH = BASE_DIR / 'purged_tags.log'
+
+# Компилировать шаблоны и загружать справочники при старте процесса,
+# см. blogicum/wsgi.py.
+WARM_UP_ON_START = False
+
 LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = 'blog:index'
 
@@ -74,6 +84,29 @@ TEMPLATES = [
     }
 ]
 
+# Jinja-версии шаблонов blog/ и includes/. Представления из JINJA2_VIEWS
+# рендерят их вместо шаблонов Django, если установлен Jinja2.
+JINJA2_TEMPLATES_DIR = BASE_DIR / 'jinja2'
+
+JINJA2_VIEWS = []
+
+# Ленты, которые отдаются потоком: <head> и шапка уходят клиенту сразу,
+# карточки — по мере рендеринга. Например, ['blog:index', 'blog:profile'].
+STREAMING_VIEWS = []
+
+if find_spec('jinja2'):
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [JINJA2_TEMPLATES_DIR],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'blog.jinja2.environment',
+            'context_processors': TEMPLATES[0]['OPTIONS'][
+                'context_processors'
+            ],
+        },
+    })
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -88,6 +121,29 @@ DATABASES = {
 }
 
 
+# Общий для всех процессов кеш. Файловый бэкенд подходит для одной
+# машины; в нескольких экземплярах приложения его заменяет memcached
+# (DJANGO_MEMCACHED в профиле prod).
+#
+# У файлового бэкенда add() и incr() проверяют и записывают ключ в два
+# шага, поэтому блокировка перестройки страниц в нём лишь уменьшает
+# число одновременных перестроек, но не гарантирует одну. Переполнившись,
+# он удаляет треть файлов наугад, включая ключи версий; версии поэтому
+# заводятся значениями, которые не повторяются (blog.versions), а
+# MAX_ENTRIES задан с запасом, чтобы вытеснение было редким.
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'blogicum_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20_000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,56 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, DATABASES, TEMPLATES
+
+DEBUG = False
+
+# Ключ из base.py лежит в репозитории, поэтому в prod без своего ключа
+# проект не запускается.
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured(
+        'Задайте переменную окружения DJANGO_SECRET_KEY.'
+    ) from None
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', ' '.join(ALLOWED_HOSTS)
+).split()
+
+# Шаблоны читаются и разбираются один раз на процесс, а не при каждом
+# {% include %} карточки.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}, *TEMPLATES[1:]]
+
+WARM_UP_ON_START = True
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 60)),
+    }
+}
+
+# В memcached add() атомарен, и устаревшую страницу перестраивает ровно
+# один запрос; о файловом кеше без него см. base.py.
+if os.environ.get('DJANGO_MEMCACHED'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['DJANGO_MEMCACHED'],
+        }
+    }
@@ -1,7 +1,14 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Прогрев здесь, а не в AppConfig.ready(): он нужен только процессу,
+# обслуживающему запросы, а не каждой команде manage.py.
+if settings.WARM_UP_ON_START:
+    from blog.warmup import warm_up_server
+    warm_up_server()
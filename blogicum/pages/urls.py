@@ -9,4 +9,5 @@ urlpatterns = [
     path('404/', views.TempView404.as_view(), name='404'),
     path('403csrf/', views.TempView403.as_view(), name='403csrf'),
     path('500/', views.TempView500.as_view(), name='500'),
+    path('user-menu/', views.UserMenuView.as_view(), name='user_menu'),
 ]
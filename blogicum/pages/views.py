@@ -1,3 +1,5 @@
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from django.views.generic import TemplateView
 from django.contrib.auth import get_user_model
 
@@ -13,6 +15,12 @@ class RulesTempView(TemplateView):
     template_name = 'pages/rules.html'
 
 
+@method_decorator(never_cache, name='dispatch')
+class UserMenuView(TemplateView):
+    """Меню пользователя в шапке, которое подгружается отдельно."""
+    template_name = 'includes/user_menu.html'
+
+
 class TempView404(TemplateView):
     template_name = 'pages/404.html'
 
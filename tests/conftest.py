@@ -41,6 +41,31 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def local_caches():
+    # Файловый кеш из настроек общий с dev-сервером и параллельными
+    # запусками тестов; у каждого процесса тестов свой кеш в памяти.
+    # В нём, как и в memcached, add() атомарен.
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "blogicum-tests",
+        }
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(local_caches):
+    # id объектов в тестовой БД повторяются от теста к тесту.
+    from django.core.cache import cache
+    from blog.hot_cache import hot_cache
+
+    cache.clear()
+    hot_cache.clear_local()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
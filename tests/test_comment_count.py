@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_views_update_counter(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при создании комментария увеличивается счётчик "
+        "`comment_count` у поста."
+    )
+
+    comment = post.comments.get()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик "
+        "`comment_count` у поста."
+    )
+
+
+def test_cascade_delete_updates_counter(
+        mixer: Mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post, author=post.author)
+    post.refresh_from_db()
+    assert post.comment_count == 4
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик `comment_count` уменьшается при каскадном "
+        "удалении комментариев."
+    )
+
+
+def test_reconcile_comment_counts(
+        mixer: Mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    post.__class__.objects.filter(pk=post.pk).update(comment_count=100)
+
+    call_command("reconcile_comment_counts", chunk_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `reconcile_comment_counts` исправляет "
+        "расхождения счётчика комментариев."
+    )
+
+
+def test_backfill_post_excerpts(post_with_published_location):
+    post = post_with_published_location
+    post.__class__.objects.filter(pk=post.pk).update(
+        text="раз два три четыре пять шесть семь восемь девять десять "
+             "одиннадцать",
+        excerpt="",
+    )
+
+    call_command("backfill_post_excerpts", batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt == (
+        "раз два три четыре пять шесть семь восемь девять десять …"
+    ), "Убедитесь, что команда `backfill_post_excerpts` заполняет анонсы."
@@ -0,0 +1,192 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+PAGE_QUERY = 'ORDER BY "blog_post"."pub_date" DESC'
+
+
+def revalidate(client, url, etag):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    return response, [query["sql"] for query in ctx.captured_queries]
+
+
+@pytest.mark.parametrize(
+    "url_fn",
+    [
+        lambda post: "/",
+        lambda post: f"/category/{post.category.slug}/",
+        lambda post: f"/profile/{post.author.username}/",
+    ],
+    ids=["index", "category_posts", "profile"],
+)
+def test_unchanged_feed_answers_304_before_page_query(
+        user_client, post_with_published_location, url_fn
+):
+    url = url_fn(post_with_published_location)
+    etag = user_client.get(url)["ETag"]
+    response, queries = revalidate(user_client, url, etag)
+    assert response.status_code == 304, (
+        f"Убедитесь, что страница `{url}` отвечает 304 на If-None-Match "
+        "с её текущим ETag."
+    )
+    assert not [sql for sql in queries if PAGE_QUERY in sql], (
+        "Убедитесь, что 304 отдаётся без запроса карточек страницы."
+    )
+
+
+def test_feed_has_no_last_modified(user_client, post_with_published_location):
+    response = user_client.get("/")
+    assert "Last-Modified" not in response, (
+        "Убедитесь, что лента не отдаёт Last-Modified: удаление поста "
+        "или наступление отложенной публикации его не сдвигают."
+    )
+    post_with_published_location.delete()
+    response = user_client.get(
+        "/", HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2099 00:00:00 GMT"
+    )
+    assert response.status_code == 200
+
+
+def test_cached_anonymous_page_answers_304(
+        client, post_with_published_location
+):
+    etag = client.get("/")["ETag"]
+    response, queries = revalidate(client, "/", etag)
+    assert response.status_code == 304
+    assert not queries
+
+
+def test_feed_etag_changes_with_content(
+        mixer: Mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    etag = user_client.get("/")["ETag"]
+
+    mixer.blend("blog.Comment", post=post, author=user)
+    response, _ = revalidate(user_client, "/", etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag ленты."
+    )
+
+    etag = response["ETag"]
+    user.username = "renamed_author"
+    user.save()
+    response, _ = revalidate(user_client, "/", etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что смена имени автора меняет ETag ленты."
+    )
+
+
+def test_large_feed_etag_changes_on_delete_and_publication(
+        mixer: Mixer, user, published_category, user_client, monkeypatch
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog import constants
+    from blog.models import Post
+
+    monkeypatch.setattr(constants, "FEED_COUNT_EXACT_LIMIT", 3)
+    now = timezone.now()
+    posts = mixer.cycle(8).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=(now - timedelta(hours=i + 1) for i in range(8)),
+    )
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=now + timedelta(days=1),
+    )
+    etag = user_client.get("/")["ETag"]
+
+    posts[0].delete()
+    response, _ = revalidate(user_client, "/", etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что удаление поста меняет ETag ленты, даже если "
+        "число её постов только оценивается."
+    )
+
+    etag = response["ETag"]
+    # Отложенная публикация наступает без сохранения поста.
+    Post.objects.filter(pk=scheduled.pk).update(pub_date=now)
+    response, _ = revalidate(user_client, "/", etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что наступление отложенной публикации меняет ETag ленты."
+    )
+
+
+def test_feed_etag_depends_on_page(user_client, post_with_published_location):
+    etag = user_client.get("/")["ETag"]
+    response, _ = revalidate(user_client, "/?page=2", etag)
+    assert response.status_code != 304
+
+
+def test_post_detail_etag_follows_shown_data(
+        mixer: Mixer, user, another_user, client, user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    assert "Last-Modified" not in response, (
+        "Убедитесь, что страница поста не отдаёт Last-Modified: "
+        "переименование категории или местоположения его не сдвигает."
+    )
+    response, _ = revalidate(client, url, response["ETag"])
+    assert response.status_code == 304, (
+        "Убедитесь, что страница поста отвечает 304 на If-None-Match."
+    )
+
+    comment = mixer.blend("blog.Comment", post=post, author=another_user)
+    etag = user_client.get(url)["ETag"]
+    comment.text = "Исправленный текст"
+    comment.save()
+    response, _ = revalidate(user_client, url, etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что правка комментария меняет ETag страницы поста."
+    )
+
+    for obj, field in (
+        (another_user, "username"), (post.location, "name"),
+        (post.category, "title"),
+    ):
+        etag = client.get(url)["ETag"]
+        setattr(obj, field, "Новое имя")
+        obj.save()
+        response, _ = revalidate(client, url, etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что смена `{field}` у {obj._meta.model_name} "
+            "меняет ETag страницы поста."
+        )
+
+
+def test_post_detail_etag_is_per_user(
+        user_client, another_user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    response, _ = revalidate(another_user_client, url, etag)
+    assert response.status_code == 200
+
+
+def test_post_detail_etag_changes_with_csrf_token(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    assert "Last-Modified" not in response, (
+        "Убедитесь, что страница поста с формой комментария не отдаёт "
+        "вошедшему пользователю Last-Modified."
+    )
+    etag = user_client.get(url)["ETag"]
+    # При новом входе Django выдаёт новый CSRF-токен.
+    user_client.cookies["csrftoken"] = "a" * 32
+    response, _ = revalidate(user_client, url, etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы поста меняется вместе с CSRF-токеном "
+        "формы комментария."
+    )
@@ -0,0 +1,135 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import constants
+from blog.hot_cache import TwoTierCache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def post_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+    ]
+
+
+def test_local_tier_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(constants, "HOT_CACHE_MAX_ENTRIES", 2)
+    worker = TwoTierCache()
+    for key in ("a", "b"):
+        worker.set(key, key)
+    worker.get("a")
+    worker.set("c", "c")
+    assert list(worker._local) == ["a", "c"], (
+        "Убедитесь, что первый уровень вытесняет давно не читанные записи."
+    )
+
+
+def test_local_tier_expires_to_shared_tier(monkeypatch):
+    monkeypatch.setattr(constants, "HOT_CACHE_LOCAL_TIMEOUT", 0)
+    worker = TwoTierCache()
+    worker.set("key", "value")
+    assert worker._get_local("key") is None
+    assert worker.get("key") == "value", (
+        "Убедитесь, что истёкшая в процессе запись читается из общего кеша."
+    )
+
+
+def test_invalidation_clears_local_tier_in_other_workers(monkeypatch):
+    monkeypatch.setattr(constants, "HOT_CACHE_CHECK_INTERVAL", 0)
+    first, second = TwoTierCache(), TwoTierCache()
+    first.set("post:1", "old")
+    first.set("post:2", "other")
+    assert second.get("post:1") == "old"
+    assert second.get("post:2") == "other"
+
+    first.delete_many(["post:1"])
+    assert second.get("post:1") is None, (
+        "Убедитесь, что удаление ключа сбрасывает первый уровень кеша "
+        "и в других процессах."
+    )
+    assert "post:2" in second._local, (
+        "Убедитесь, что удаление ключа не очищает первый уровень целиком."
+    )
+
+
+def test_value_loaded_during_invalidation_is_not_served():
+    first, second = TwoTierCache(), TwoTierCache()
+
+    def load():
+        second.delete_many(["post:1"])
+        return "old"
+
+    assert first.get_or_load("post:1", load) == "old"
+    first.clear_local()
+    assert first.get("post:1") is None, (
+        "Убедитесь, что значение, загруженное во время удаления ключа, "
+        "не отдаётся из кеша."
+    )
+
+
+def test_invalidation_is_repeated_after_commit(
+        django_capture_on_commit_callbacks
+):
+    worker = TwoTierCache()
+    with django_capture_on_commit_callbacks() as callbacks:
+        worker.delete_many(["post:1"])
+        worker.set("post:1", "read before commit")
+    for callback in callbacks:
+        callback()
+    assert worker.get("post:1") is None, (
+        "Убедитесь, что ключ удаляется ещё раз после фиксации транзакции."
+    )
+
+
+def test_post_detail_is_served_from_hot_cache(
+        client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    response, queries = post_queries(client, url)
+    assert response.status_code == 200
+    assert not queries, (
+        "Убедитесь, что пост на странице поста берётся из кеша."
+    )
+
+
+def test_hot_post_follows_changes(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in client.get(url).content.decode()
+
+    post.is_published = False
+    post.save()
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что снятый с публикации пост не отдаётся из кеша."
+    )
+    assert user_client.get(url).status_code == 200, (
+        "Убедитесь, что автор видит свой неопубликованный пост."
+    )
+
+
+def test_profile_header_follows_rename(client, user):
+    old_url = f"/profile/{user.username}/"
+    client.get(old_url)
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(old_url)
+    assert not [
+        query for query in ctx.captured_queries
+        if 'FROM "auth_user"' in query["sql"]
+    ], "Убедитесь, что шапка профиля берётся из кеша."
+
+    user.username = "renamed_user"
+    user.save()
+    assert client.get(old_url).status_code == 404
+    assert client.get("/profile/renamed_user/").status_code == 200
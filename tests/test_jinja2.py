@@ -0,0 +1,136 @@
+import html
+import re
+
+import pytest
+from django.core.cache import cache
+from django.template import engines
+from mixer.backend.django import Mixer
+
+pytest.importorskip("jinja2")
+
+pytestmark = [pytest.mark.django_db]
+
+BLOG_VIEWS = [
+    "blog:index", "blog:category_posts", "blog:profile", "blog:post_detail",
+    "blog:post_comments", "blog:create_post", "blog:edit_post",
+    "blog:delete_post", "blog:edit_comment", "blog:delete_comment",
+    "blog:edit_profile",
+]
+
+# Маскированный CSRF-токен новый при каждом рендеринге.
+CSRF_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]+')
+
+
+def normalize(content):
+    """HTML без различий в экранировании и пробелах между движками."""
+    content = CSRF_RE.sub(r"\1", content.decode())
+    return " ".join(html.unescape(content).split())
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category, published_location):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, text="Первая строка\nвторая & <тег>",
+        title="Пост «с кавычками» & 'апострофом'",
+    )
+    mixer.cycle(25).blend(
+        "blog.Comment", post=post, author=user, text="Текст\nкомментария"
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    return post
+
+
+def page_urls(post):
+    comment = post.comments.order_by("created_at", "id").first()
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+        f"/posts/{post.id}/comments/",
+        "/posts/create/",
+        f"/posts/{post.id}/edit/",
+        f"/posts/{post.id}/edit_comment/{comment.id}/",
+        f"/posts/{post.id}/delete_comment/{comment.id}/",
+        "/edit_profile/",
+    ]
+
+
+@pytest.mark.parametrize("as_author", [True, False], ids=["author", "guest"])
+def test_jinja2_pages_match_django(
+        settings, post, user_client, another_user_client, as_author
+):
+    client = user_client if as_author else another_user_client
+    for url in page_urls(post):
+        settings.JINJA2_VIEWS = []
+        cache.clear()
+        expected = client.get(url)
+        settings.JINJA2_VIEWS = BLOG_VIEWS
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == expected.status_code
+        assert normalize(response.content) == normalize(expected.content), (
+            f"Убедитесь, что Jinja-версия страницы `{url}` выводит тот же "
+            "HTML, что и шаблон Django."
+        )
+
+
+def test_jinja2_is_selected_per_view(settings, user_client, post):
+    settings.JINJA2_VIEWS = ["blog:index"]
+    response = user_client.get("/")
+    assert [t.origin.template_name for t in response.templates] == [], (
+        "Убедитесь, что страница из JINJA2_VIEWS рендерится Jinja2."
+    )
+    response = user_client.get(f"/posts/{post.id}/")
+    assert "blog/detail.html" in [
+        t.name for t in response.templates
+    ], (
+        "Убедитесь, что остальные страницы по-прежнему рендерятся "
+        "шаблонами Django."
+    )
+
+
+def test_jinja2_filters(post):
+    template = engines["jinja2"].from_string(
+        "{{ post.pub_date|date }}|{{ post.text|linebreaksbr }}|"
+        "{{ post.text|truncatewords(2) }}|{{ url('blog:post_detail', 1) }}|"
+        "{{ static('img/logo.png') }}"
+    )
+    reference = engines["django"].from_string(
+        '{% load static %}{{ post.pub_date|date:"d E Y, H:i" }}|'
+        "{{ post.text|linebreaksbr }}|{{ post.text|truncatewords:2 }}|"
+        "{% url 'blog:post_detail' 1 %}|{% static 'img/logo.png' %}"
+    )
+    context = {"post": post}
+    assert html.unescape(template.render(context)) == html.unescape(
+        reference.render(context)
+    )
+
+
+def test_jinja2_card_cache_timeout_matches_django(
+        settings, client, post, monkeypatch
+):
+    from django.core.cache import caches
+
+    from blog.constants import CARD_CACHE_TIMEOUT
+
+    fragments = caches["default"]
+    original_set = fragments.set
+    timeouts = []
+
+    def set_fragment(key, value, timeout=None, *args, **kwargs):
+        if key.startswith("template.cache.post_card"):
+            timeouts.append(timeout)
+        return original_set(key, value, timeout, *args, **kwargs)
+
+    settings.JINJA2_VIEWS = BLOG_VIEWS
+    monkeypatch.setattr(fragments, "set", set_fragment)
+    client.get("/")
+    assert timeouts and set(timeouts) == {CARD_CACHE_TIMEOUT}, (
+        "Убедитесь, что Jinja-карточка кешируется на CARD_CACHE_TIMEOUT "
+        "секунд, как и в шаблонах Django."
+    )
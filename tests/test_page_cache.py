@@ -0,0 +1,335 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog import purge
+from blog.page_cache import FEED_TAG, invalidate_tags, post_tags
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(ctx.captured_queries)
+
+
+def test_anonymous_feed_is_cached(client, post_with_published_location):
+    client.get("/")
+    response, queries = get_queries(client, "/")
+    assert queries == 0, (
+        "Убедитесь, что главная страница для анонимных пользователей "
+        "отдаётся из кеша."
+    )
+    assert post_with_published_location.title in response.content.decode()
+
+
+def test_logged_in_feed_is_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    _, queries = get_queries(user_client, "/")
+    assert queries > 0
+
+
+def test_comment_purges_only_pages_with_post(
+        client, mixer: Mixer, user, post_with_published_location,
+        post_with_another_category
+):
+    post = post_with_published_location
+    other_category_url = (
+        f"/category/{post_with_another_category.category.slug}/"
+    )
+    for url in ("/", other_category_url):
+        client.get(url)
+
+    mixer.blend("blog.Comment", post=post, author=user)
+
+    response, queries = get_queries(client, "/")
+    assert queries > 0, (
+        "Убедитесь, что новый комментарий сбрасывает кеш страниц "
+        "с карточкой поста."
+    )
+    assert "Комментарии (1)" in response.content.decode()
+    _, queries = get_queries(client, other_category_url)
+    assert queries == 0, (
+        "Убедитесь, что новый комментарий не сбрасывает кеш страниц "
+        "без карточки поста."
+    )
+
+
+def test_new_post_purges_feed(
+        client, mixer: Mixer, user, published_category,
+        post_with_published_location
+):
+    client.get("/")
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+    )
+    response, _ = get_queries(client, "/")
+    assert new_post.title in response.content.decode(), (
+        "Убедитесь, что новый пост сбрасывает кеш ленты."
+    )
+
+
+def test_post_card_fragment_is_cached(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    type(post).objects.filter(pk=post.pk).update(title="Без сигнала")
+    content = user_client.get("/").content.decode()
+    assert "Без сигнала" not in content, (
+        "Убедитесь, что карточка поста кешируется как фрагмент шаблона."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    content = user_client.get("/").content.decode()
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что кеш карточки сбрасывается при изменении поста."
+    )
+
+
+def test_post_card_fragment_follows_author_username(
+        user_client, user, post_with_published_location
+):
+    user_client.get("/")
+    user.username = "renamed_author"
+    user.save()
+    content = user_client.get("/").content.decode()
+    assert "@renamed_author" in content, (
+        "Убедитесь, что кеш карточки сбрасывается при смене имени автора."
+    )
+
+
+def test_post_without_category_and_location_has_no_empty_tags(
+        mixer: Mixer, user
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=None, location=None
+    )
+    assert post_tags(post) == {f"post:{post.id}", f"author:{user.id}"}, (
+        "Убедитесь, что у поста без категории и местоположения нет тегов "
+        "`category:None` и `location:None`."
+    )
+
+
+def test_evicted_tag_versions_do_not_revive_old_cards(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    post.title = "Новый заголовок"
+    post.save()
+    user_client.get("/")
+    # Общий кеш при переполнении удаляет и ключи версий.
+    cache.delete_many([f"tag-version:{tag}" for tag in post_tags(post)])
+    content = user_client.get("/").content.decode()
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что версии тегов после вытеснения из кеша не "
+        "повторяют прежние и старые карточки не возвращаются."
+    )
+
+
+def test_change_during_render_leaves_stored_page_stale(
+        client, monkeypatch, post_with_published_location
+):
+    from blog import views
+
+    post = post_with_published_location
+    stamp_cards = views.stamp_cards
+
+    def stamp_cards_and_edit_post(posts):
+        # Пост меняется, когда страница уже прочитала его из БД.
+        stamp_cards(posts)
+        type(post).objects.filter(pk=post.pk).update(title="Новый заголовок")
+        invalidate_tags(*post_tags(post))
+
+    monkeypatch.setattr(views, "stamp_cards", stamp_cards_and_edit_post)
+    client.get("/")
+    monkeypatch.undo()
+    content = client.get("/").content.decode()
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что страница кешируется с версиями тегов, прочитанными "
+        "до рендеринга, и изменение во время него её не освежает."
+    )
+
+
+def test_feed_is_publicly_cacheable(client, post_with_published_location):
+    response = client.get("/")
+    assert "public" in response["Cache-Control"], (
+        "Убедитесь, что лента помечена для кеширования прокси-серверами."
+    )
+    assert "Cookie" not in response.get("Vary", ""), (
+        "Убедитесь, что ответ ленты не зависит от cookie."
+    )
+
+
+def test_user_menu_is_loaded_separately(user, user_client):
+    feed = user_client.get("/").content.decode()
+    assert f'href="/profile/{user.username}/"' not in feed, (
+        "Убедитесь, что страница ленты не содержит меню пользователя."
+    )
+    response = user_client.get("/pages/user-menu/")
+    assert user.username in response.content.decode()
+    assert "private" in response["Cache-Control"] or (
+        "no-cache" in response["Cache-Control"]
+    ), "Убедитесь, что меню пользователя не кешируется прокси-серверами."
+
+
+def test_feed_sends_surrogate_keys(client, post_with_published_location):
+    post = post_with_published_location
+    for _ in range(2):
+        keys = set(client.get("/")["Surrogate-Key"].split())
+        assert {"feed", f"post:{post.id}", f"author:{post.author_id}"} <= (
+            keys
+        ), (
+            "Убедитесь, что ответ ленты, в том числе из кеша, содержит "
+            "теги постов в заголовке `Surrogate-Key`."
+        )
+
+
+@pytest.fixture
+def purge_outbox(settings):
+    settings.CACHE_PURGE_BACKEND = "blog.purge.LocMemPurgeBackend"
+    purge.outbox.clear()
+    yield purge.outbox
+    purge.outbox.clear()
+
+
+def test_comment_purges_proxy_after_commit(
+        user_client, post_with_published_location, purge_outbox,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": "Т"})
+        assert not purge_outbox, (
+            "Убедитесь, что кеш прокси сбрасывается только после фиксации "
+            "транзакции."
+        )
+    assert callbacks
+    assert {f"post:{post.id}"} in purge_outbox
+
+
+def test_comment_edit_purges_proxy(
+        mixer: Mixer, user, post_with_published_location, purge_outbox,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    purge_outbox.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.text = "Исправленный текст"
+        comment.save()
+    assert {f"post:{post.id}"} in purge_outbox, (
+        "Убедитесь, что правка комментария сбрасывает страницу поста "
+        "в кеше прокси."
+    )
+
+
+def test_http_purge_backend_sends_purge(settings, monkeypatch):
+    settings.CACHE_PURGE_URLS = ["http://proxy-a/", "http://proxy-b/"]
+    sent = []
+
+    class Response:
+        def close(self):
+            pass
+
+    def urlopen(request, timeout):
+        sent.append(request)
+        return Response()
+
+    monkeypatch.setattr(purge.urllib.request, "urlopen", urlopen)
+    purge.HttpPurgeBackend().purge({"post:1", "feed"})
+    assert [request.full_url for request in sent] == [
+        "http://proxy-a/", "http://proxy-b/"
+    ]
+    assert all(request.get_method() == "PURGE" for request in sent)
+    assert sent[0].get_header("Surrogate-key") == "feed post:1"
+
+
+def test_file_purge_backend_appends_tags(tmp_path):
+    path = tmp_path / "purged.log"
+    backend = purge.FilePurgeBackend(path)
+    backend.purge({"post:1", "feed"})
+    backend.purge({"category:2"})
+    assert path.read_text().splitlines() == ["feed post:1", "category:2"]
+
+
+PAGE_QUERY = 'ORDER BY "blog_post"."pub_date" DESC'
+
+
+def hammer(url, workers=16):
+    """Запрашивает страницу одновременно из пула потоков.
+
+    Возвращает статусы ответов и число запросов карточек к БД. Запрос
+    карточек нарочно замедлен, чтобы остальные потоки успели прийти,
+    пока страница строится.
+    """
+    barrier = threading.Barrier(workers)
+    page_queries = []
+
+    def slow_page_query(execute, sql, params, many, context):
+        if PAGE_QUERY in sql:
+            page_queries.append(sql)
+            threading.Event().wait(0.3)
+        return execute(sql, params, many, context)
+
+    def get(_):
+        try:
+            with connection.execute_wrapper(slow_page_query):
+                barrier.wait()
+                return Client().get(url).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(workers) as pool:
+        statuses = list(pool.map(get, range(workers)))
+    return statuses, len(page_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cold_feed_is_built_once(post_with_published_location):
+    statuses, page_queries = hammer("/")
+    assert set(statuses) == {200}
+    assert page_queries == 1, (
+        "Убедитесь, что при одновременных запросах к пустому кешу ленту "
+        "строит только один запрос, а остальные ждут результата."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stale_feed_is_rebuilt_once(post_with_published_location):
+    Client().get("/")
+    invalidate_tags(FEED_TAG)
+    statuses, page_queries = hammer("/")
+    assert set(statuses) == {200}
+    assert page_queries == 1, (
+        "Убедитесь, что устаревшую ленту перестраивает один запрос, "
+        "а остальные получают её прежнюю версию."
+    )
+
+
+def test_feed_expires_early_near_deadline(
+        client, post_with_published_location, monkeypatch
+):
+    from blog import page_cache
+
+    client.get("/")
+    entry = cache.get(page_cache.page_key("/"))
+    assert entry.is_fresh(entry.fresh_until - 60)
+
+    monkeypatch.setattr(page_cache.random, "random", lambda: 0.999999)
+    assert not entry._replace(duration=5).is_fresh(entry.fresh_until - 60), (
+        "Убедитесь, что дорогая страница может обновиться до истечения "
+        "срока жизни записи."
+    )
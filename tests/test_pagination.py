@@ -0,0 +1,249 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Одинаковые даты у соседних постов проверяют разрешение по id.
+    dates = (
+        now - timedelta(hours=1 + i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=dates,
+    )
+
+
+def get_cursor_link(content: str, param: str) -> str:
+    match = re.search(rf'href="\?{param}=([^"]+)"', content)
+    assert match, f"Убедитесь, что пагинатор выводит ссылку `?{param}=`."
+    return f"/?{param}={match.group(1)}"
+
+
+@pytest.fixture
+def cursor_feed(monkeypatch):
+    from blog import constants
+
+    monkeypatch.setattr(constants, "FEED_NUMBERED_PAGES_LIMIT", 1)
+
+
+def test_cursor_pages_walk_the_whole_feed(client, feed_posts, cursor_feed):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+
+    response = client.get("/")
+    pages = [[post.id for post in response.context["page_obj"]]]
+    while response.context["page_obj"].has_next():
+        url = get_cursor_link(response.content.decode(), "after")
+        response = client.get(url)
+        pages.append([post.id for post in response.context["page_obj"]])
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что переход по курсорам `?after=` обходит ленту "
+        "целиком без пропусков и повторов."
+    )
+
+    url = get_cursor_link(response.content.decode(), "before")
+    response = client.get(url)
+    assert [post.id for post in response.context["page_obj"]] == pages[-2], (
+        "Убедитесь, что курсор `?before=` возвращает на предыдущую страницу."
+    )
+
+
+def test_numbered_pages_still_work(client, feed_posts):
+    response = client.get("/?page=2")
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    assert response.context["page_obj"].number == 2
+
+
+def test_short_feed_is_paged_by_numbers_only(client, feed_posts):
+    content = client.get("/").content.decode()
+    assert 'href="?page=2"' in content
+    assert "?after=" not in content and "?before=" not in content, (
+        "Убедитесь, что короткая лента листается только номерами страниц."
+    )
+    next_url = get_cursor_link(content, "page")
+    content = client.get(next_url).content.decode()
+    assert 'href="?page=3"' in content and 'href="?page=1"' in content, (
+        "Убедитесь, что после перехода `>>` номера страниц остаются."
+    )
+
+
+def test_long_feed_is_paged_by_cursors_only(client, feed_posts, cursor_feed):
+    content = client.get("/").content.decode()
+    assert "?after=" in content
+    assert 'href="?page=2"' not in content, (
+        "Убедитесь, что длинная лента листается только курсорами."
+    )
+
+
+def test_cursor_pages_are_cached(client, feed_posts, cursor_feed):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    url = get_cursor_link(client.get("/").content.decode(), "after")
+    content = client.get(url).content
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.content == content and not ctx.captured_queries, (
+        "Убедитесь, что курсорные страницы ленты попадают в кеш страниц."
+    )
+
+
+def test_broken_cursor_falls_back_to_first_page(client, feed_posts):
+    response = client.get("/?after=broken")
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    assert not response.context["page_obj"].has_previous()
+
+
+@pytest.fixture
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_feed_count_is_cached(
+        user_client, feed_posts, clear_cache, django_assert_num_queries
+):
+    user_client.get("/")
+    # Время изменения ленты для валидаторов и сама страница, без COUNT;
+    # меню пользователя загружается отдельным запросом.
+    with django_assert_num_queries(2):
+        response = user_client.get("/")
+    assert response.context["page_obj"].paginator.count == len(feed_posts), (
+        "Убедитесь, что количество постов ленты берётся из кеша и не "
+        "пересчитывается на каждом запросе."
+    )
+
+
+def test_feed_count_resets_on_new_post(
+        client, mixer: Mixer, user, published_category, feed_posts,
+        clear_cache
+):
+    client.get("/")
+    mixer.blend("blog.Post", author=user, category=published_category)
+    response = client.get("/")
+    assert response.context["page_obj"].paginator.count == (
+        len(feed_posts) + 1
+    ), "Убедитесь, что кеш количества постов сбрасывается при их изменении."
+
+
+def test_feed_count_estimate_for_large_feeds(
+        client, feed_posts, clear_cache, monkeypatch
+):
+    from blog import constants
+
+    monkeypatch.setattr(constants, "FEED_COUNT_EXACT_LIMIT", N_PER_PAGE)
+    response = client.get("/")
+    assert response.context["page_obj"].paginator.count == len(feed_posts), (
+        "Убедитесь, что для больших лент количество постов оценивается "
+        "по числу опубликованных постов."
+    )
+
+
+def test_page_range_is_elided():
+    from blog.paginators import FeedPaginator
+
+    paginator = FeedPaginator(list(range(N_PER_PAGE * 1000)), N_PER_PAGE)
+    page_range = paginator.get_page(500).page_range
+    assert len(page_range) < 20, (
+        "Убедитесь, что пагинатор выводит не все номера страниц, а только "
+        "крайние и соседние с текущей."
+    )
+    assert page_range[0] == 1 and page_range[-1] == 1000
+    assert paginator.ELLIPSIS in page_range
+
+
+def test_post_comments_are_paginated(
+        client, mixer: Mixer, user, post_with_published_location
+):
+    from blog import constants
+
+    post = post_with_published_location
+    comments = mixer.cycle(constants.COMMENTS_LIMIT_FOR_PAGE + 5).blend(
+        "blog.Comment", post=post, author=user,
+    )
+    response = client.get(f"/posts/{post.id}/")
+    shown = [comment.id for comment in response.context["comments"]]
+    assert shown == [
+        comment.id for comment in comments
+    ][:constants.COMMENTS_LIMIT_FOR_PAGE], (
+        "Убедитесь, что на странице поста выводится только первая порция "
+        "комментариев."
+    )
+
+    match = re.search(
+        r'data-comments-more>\s*<a[^>]*data-url="([^"]+)"',
+        response.content.decode("utf-8"),
+    )
+    assert match, (
+        "Убедитесь, что под комментариями есть кнопка загрузки следующих."
+    )
+    fragment = client.get(match.group(1).replace("&amp;", "&"))
+    assert fragment.status_code == 200
+    assert [comment.id for comment in fragment.context["comments"]] == [
+        comment.id for comment in comments
+    ][constants.COMMENTS_LIMIT_FOR_PAGE:], (
+        "Убедитесь, что фрагмент комментариев продолжает список с места, "
+        "где закончилась предыдущая порция."
+    )
+    assert "<html" not in fragment.content.decode("utf-8")
+
+
+def test_comment_created_at_is_required():
+    from blog.models import Comment
+
+    assert not Comment._meta.get_field("created_at").null, (
+        "Убедитесь, что у комментария всегда есть дата добавления: "
+        "по ней строятся курсоры страниц комментариев."
+    )
+
+
+def test_cursor_with_huge_id_falls_back_to_first_page(
+        client, feed_posts, post_with_published_location
+):
+    from django.utils.http import urlsafe_base64_encode
+
+    token = urlsafe_base64_encode(
+        f"{timezone.now().isoformat()}|{2 ** 70}".encode()
+    )
+    post_id = post_with_published_location.id
+    for url in (
+        f"/?after={token}", f"/posts/{post_id}/comments/?after={token}"
+    ):
+        assert client.get(url).status_code == 200, (
+            f"Убедитесь, что `{url}` с id курсора вне диапазона БД "
+            "не приводит к ошибке сервера."
+        )
+
+
+def test_broken_cursor_pages_are_not_cached(client, feed_posts):
+    from django.core.cache import cache
+
+    from blog.page_cache import page_key
+
+    client.get("/")
+    keys = len(cache._cache)
+    for token in ("junk1", "junk2", "junk3"):
+        client.get(f"/?after={token}")
+    assert len(cache._cache) == keys, (
+        "Убедитесь, что страницы с неразборчивым курсором не попадают "
+        "в кеш страниц."
+    )
+    assert cache.get(page_key("/")) is not None
@@ -0,0 +1,100 @@
+import pytest
+from django.core.cache import cache, caches
+from django.template import engines
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.page_cache import stamp_cards
+from blog.templatetags.post_cards import card_key
+
+pytestmark = [pytest.mark.django_db]
+
+# Цикл из blog/index.html до появления тега {% post_cards %}.
+INCLUDE_LOOP = """{% for post in page_obj %}
+    <article class="mb-5">
+      {% include "includes/post_card.html" %}
+    </article>
+  {% endfor %}"""
+
+POST_CARDS = """{% load post_cards %}{% post_cards page_obj %}
+    <article class="mb-5">
+      {{ card }}
+    </article>
+  {% endpost_cards %}"""
+
+
+@pytest.fixture
+def cards(mixer: Mixer, published_category, published_location):
+    unpublished_category = mixer.blend("blog.Category", is_published=False)
+    unpublished_location = mixer.blend("blog.Location", is_published=False)
+    author = mixer.blend("auth.User", username="автор.тест+1@x")
+    mixer.blend(
+        "blog.Post", author=author, category=published_category,
+        location=published_location, image="posts_images/card.jpg",
+        title="<b>Заголовок & «кавычки»</b>",
+    )
+    mixer.blend(
+        "blog.Post", author=author, category=published_category,
+        location=unpublished_location,
+    )
+    mixer.blend(
+        "blog.Post", author=author, category=unpublished_category,
+        location=None,
+    )
+    mixer.blend(
+        "blog.Post", author=author, category=published_category,
+        is_published=False,
+    )
+    posts = list(Post.objects.for_cards().order_by("pk"))
+    stamp_cards(posts)
+    return posts
+
+
+def render(source, posts):
+    return engines["django"].from_string(source).render({"page_obj": posts})
+
+
+def test_post_cards_match_include_loop(cards):
+    expected = render(INCLUDE_LOOP, cards)
+
+    cache.clear()
+    assert render(POST_CARDS, cards) == expected, (
+        "Убедитесь, что тег `post_cards` выводит тот же HTML, что и "
+        "include карточки в цикле."
+    )
+    assert render(POST_CARDS, cards) == expected, (
+        "Убедитесь, что карточки из кеша фрагментов совпадают "
+        "с только что построенными."
+    )
+
+
+def test_post_cards_use_fragment_keys(cards):
+    cache.clear()
+    render(POST_CARDS, cards)
+    assert all(cache.get(card_key(post)) for post in cards), (
+        "Убедитесь, что тег `post_cards` кеширует карточки под ключами "
+        "фрагмента `post_card` с id поста и его штампом."
+    )
+    cache.set(card_key(cards[0]), "<p>из кеша</p>")
+    assert "<p>из кеша</p>" in render(POST_CARDS, cards), (
+        "Убедитесь, что тег `post_cards` выводит карточку из кеша "
+        "фрагментов."
+    )
+
+
+def test_post_cards_read_fragments_in_one_call(cards, monkeypatch):
+    render(POST_CARDS, cards)
+    fragments = caches["default"]
+    reads = []
+    original_get_many = fragments.get_many
+
+    def get_many(keys, *args, **kwargs):
+        reads.append(list(keys))
+        return original_get_many(keys, *args, **kwargs)
+
+    monkeypatch.setattr(fragments, "get_many", get_many)
+    render(POST_CARDS, cards)
+    assert len(reads) == 1 and len(reads[0]) == len(cards), (
+        "Убедитесь, что фрагменты карточек страницы читаются из кеша "
+        "одним запросом."
+    )
@@ -0,0 +1,190 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_page_queries(client, url: str) -> int:
+    # Первый запрос загружает справочники и прогревает кеши.
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.fixture
+def feed_posts_with_comments(mixer: Mixer, user, published_category):
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, category=published_category,
+    )
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    return posts
+
+
+@pytest.mark.parametrize(
+    "url_fn",
+    [
+        lambda post: "/",
+        lambda post: f"/category/{post.category.slug}/",
+        lambda post: f"/profile/{post.author.username}/",
+    ],
+    ids=["index", "category_posts", "profile"],
+)
+def test_feed_queries_do_not_grow_with_cards(
+        mixer: Mixer, user, published_category, client, url_fn
+):
+    first_post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+    )
+    mixer.blend("blog.Comment", post=first_post, author=user)
+    url = url_fn(first_post)
+    single_card_queries = count_page_queries(client, url)
+
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, category=published_category,
+    )
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    full_page_queries = count_page_queries(client, url)
+
+    assert full_page_queries == single_card_queries, (
+        "Убедитесь, что количество запросов к БД на странице ленты не "
+        "зависит от количества карточек постов на ней."
+    )
+
+
+def test_feed_card_shows_comment_count(
+        client, feed_posts_with_comments
+):
+    response = client.get("/")
+    content = response.content.decode("utf-8")
+    assert content.count("Комментарии (2)") == N_PER_PAGE, (
+        "Убедитесь, что в карточке поста выводится количество "
+        "комментариев к нему."
+    )
+
+
+def test_feed_cards_do_not_load_post_text(client, feed_posts_with_comments):
+    response = client.get("/")
+    for post in response.context["page_obj"]:
+        assert "text" in post.get_deferred_fields(), (
+            "Убедитесь, что для карточек ленты не загружается полный "
+            "текст поста."
+        )
+
+
+def test_post_detail_queries_do_not_grow_with_comments(
+        mixer: Mixer, user, another_user, user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    mixer.blend("blog.Comment", post=post, author=user)
+    single_comment_queries = count_page_queries(user_client, url)
+
+    mixer.cycle(10).blend(
+        "blog.Comment", post=post,
+        author=mixer.sequence(user, another_user),
+    )
+    many_comments_queries = count_page_queries(user_client, url)
+
+    assert many_comments_queries == single_comment_queries, (
+        "Убедитесь, что количество запросов к БД на странице поста не "
+        "зависит от количества комментариев."
+    )
+
+
+@pytest.mark.parametrize(
+    "url_fn",
+    [
+        lambda comment: (
+            f"/posts/{comment.post_id}/edit_comment/{comment.id}/"
+        ),
+        lambda comment: (
+            f"/posts/{comment.post_id}/delete_comment/{comment.id}/"
+        ),
+    ],
+    ids=["edit_comment", "delete_comment"],
+)
+def test_author_views_fetch_object_once(
+        mixer: Mixer, user, user_client, post_with_published_location,
+        django_assert_num_queries, url_fn
+):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user,
+    )
+    # Сессия, пользователь и сам объект.
+    with django_assert_num_queries(3):
+        response = user_client.get(url_fn(comment))
+    assert response.status_code == 200
+
+
+def test_delete_post_fetches_post_once(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.post(f"/posts/{post.id}/delete/")
+    selects = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT")
+    ]
+    assert len([
+        sql for sql in selects if 'FROM "blog_post"' in sql
+    ]) == 1, "Убедитесь, что удаляемый пост загружается из БД один раз."
+    assert len([
+        sql for sql in selects if 'FROM "auth_user"' in sql
+    ]) == 1, (
+        "Убедитесь, что для проверки авторства не загружается "
+        "автор поста."
+    )
+
+
+def test_author_views_reject_other_users(
+        mixer: Mixer, user, another_user_client, post_with_published_location
+):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user,
+    )
+    response = another_user_client.get(
+        f"/posts/{comment.post_id}/edit_comment/{comment.id}/"
+    )
+    assert response.status_code == 403
+
+
+def test_comment_create_does_not_load_post(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": "Текст"}
+        )
+    assert response.status_code == 302
+    assert not [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith('SELECT "blog_post"."id", ')
+    ], "Убедитесь, что при добавлении комментария пост не загружается целиком."
+    assert post.comments.count() == 1
+
+
+def test_comment_create_on_hidden_post(
+        another_user_client, mixer: Mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    response = another_user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Текст"}
+    )
+    assert response.status_code == 404
+    assert not post.comments.exists()
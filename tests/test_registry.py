@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_registry_reloads_after_change(published_category):
+    from blog.registry import registry
+
+    ref = registry.category_by_slug(published_category.slug)
+    assert ref.title == published_category.title
+
+    published_category.title = "Новое название"
+    published_category.save()
+    assert registry.category(published_category.id).title == (
+        "Новое название"
+    ), "Убедитесь, что реестр справочников сбрасывается при их изменении."
+
+
+def test_feed_cards_do_not_join_reference_tables(
+        client, post_with_published_location
+):
+    client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/")
+    content = response.content.decode("utf-8")
+    assert post_with_published_location.category.title in content
+    assert post_with_published_location.location.name in content
+    assert not [
+        query for query in ctx.captured_queries
+        if '"blog_location"' in query["sql"]
+        or '"blog_category"."title"' in query["sql"]
+    ], (
+        "Убедитесь, что категория и местоположение карточек берутся "
+        "из реестра справочников."
+    )
+
+
+def test_unpublished_category_page_is_404(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{category.slug}/").status_code == 404
+
+
+def test_registry_forgets_rolled_back_data(mixer, monkeypatch):
+    from django.db import transaction
+
+    from blog import constants
+    from blog.registry import registry
+
+    monkeypatch.setattr(constants, "REFERENCE_DATA_TIMEOUT", 0)
+
+    class Rollback(Exception):
+        pass
+
+    with pytest.raises(Rollback), transaction.atomic():
+        category = mixer.blend("blog.Category", slug="rolled-back")
+        registry.preload()
+        assert registry.category(category.id) is not None
+        raise Rollback
+    assert registry.category_by_slug("rolled-back") is None, (
+        "Убедитесь, что данные справочников в памяти процесса "
+        "устаревают через REFERENCE_DATA_TIMEOUT секунд."
+    )
+
+
+def test_registry_version_changes_after_commit(
+        published_category, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from blog.registry import REFERENCE_VERSION_KEY
+
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.title = "Новое название"
+        published_category.save()
+        version = cache.get(REFERENCE_VERSION_KEY)
+    assert cache.get(REFERENCE_VERSION_KEY) != version, (
+        "Убедитесь, что версия справочников меняется ещё раз после "
+        "фиксации транзакции."
+    )
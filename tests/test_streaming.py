@@ -0,0 +1,98 @@
+import importlib.util
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.page_cache import page_key
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_VIEWS = ["blog:index", "blog:category_posts", "blog:profile"]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category, published_location):
+    return mixer.cycle(12).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+
+
+def feed_urls(post):
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def test_feeds_are_streamed(settings, user_client, posts):
+    for url in feed_urls(posts[0]):
+        settings.STREAMING_VIEWS = []
+        expected = user_client.get(url).content
+        settings.STREAMING_VIEWS = FEED_VIEWS
+        response = user_client.get(url)
+        assert response.streaming, (
+            f"Убедитесь, что страница `{url}` из STREAMING_VIEWS "
+            "отдаётся потоком."
+        )
+        chunks = list(response.streaming_content)
+        assert b"".join(chunks) == expected, (
+            f"Убедитесь, что потоковая страница `{url}` совпадает "
+            "с обычной."
+        )
+        assert b"</head>" in chunks[0] and b"<header>" in chunks[0], (
+            "Убедитесь, что <head> и шапка уходят первой частью ответа."
+        )
+        assert b"card-title" not in chunks[0], (
+            "Убедитесь, что карточки отдаются после начала страницы."
+        )
+        assert len(chunks) > len(posts[:10]), (
+            "Убедитесь, что карточки отдаются по одной."
+        )
+
+
+def test_streamed_page_is_cached_for_anonymous(settings, client, posts):
+    settings.STREAMING_VIEWS = FEED_VIEWS
+    content = b"".join(client.get("/").streaming_content)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/")
+    assert response.content == content and not ctx.captured_queries, (
+        "Убедитесь, что потоковая страница после отдачи попадает "
+        "в кеш страниц."
+    )
+
+
+def test_stream_does_not_hold_rebuild_lock(settings, client, posts):
+    settings.STREAMING_VIEWS = FEED_VIEWS
+    response = client.get("/")
+    lock_key = f"{page_key('/')}:lock"
+    assert cache.get(lock_key) is None, (
+        "Убедитесь, что блокировка перестройки страницы снимается, "
+        "как только представление вернуло потоковый ответ."
+    )
+    assert cache.get(page_key("/")) is None
+    b"".join(response.streaming_content)
+    assert cache.get(page_key("/")) is not None
+
+
+def test_post_detail_is_not_streamed(settings, user_client, posts):
+    settings.STREAMING_VIEWS = FEED_VIEWS
+    assert not user_client.get(f"/posts/{posts[0].id}/").streaming
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("jinja2") is None, reason="Jinja2 не установлен"
+)
+def test_jinja2_feeds_are_streamed(settings, user_client, posts):
+    settings.JINJA2_VIEWS = FEED_VIEWS
+    for url in feed_urls(posts[0]):
+        settings.STREAMING_VIEWS = []
+        expected = user_client.get(url).content
+        settings.STREAMING_VIEWS = FEED_VIEWS
+        response = user_client.get(url)
+        assert response.streaming
+        assert b"".join(response.streaming_content) == expected
@@ -0,0 +1,96 @@
+import importlib
+import os
+import sys
+
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.template import engines
+from django.urls import get_resolver
+
+from blog.registry import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cached_loaders(settings, monkeypatch):
+    monkeypatch.setenv("DJANGO_SECRET_KEY", settings.SECRET_KEY)
+    from blogicum.settings import prod
+
+    settings.TEMPLATES = prod.TEMPLATES
+
+
+def test_benchmarks_import_prod_without_exporting_key(monkeypatch):
+    from blog.management.prod_settings import import_prod_settings
+
+    monkeypatch.delenv("DJANGO_SECRET_KEY", raising=False)
+    monkeypatch.delitem(sys.modules, "blogicum.settings.prod", raising=False)
+    assert import_prod_settings().SECRET_KEY
+    assert "DJANGO_SECRET_KEY" not in os.environ, (
+        "Убедитесь, что ключ для профиля prod не остаётся в окружении."
+    )
+
+
+def test_prod_requires_secret_key(monkeypatch):
+    monkeypatch.delenv("DJANGO_SECRET_KEY", raising=False)
+    monkeypatch.delitem(sys.modules, "blogicum.settings.prod", raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        importlib.import_module("blogicum.settings.prod")
+
+
+def test_warm_templates_fills_template_cache(
+        cached_loaders, published_category
+):
+    registry.invalidate()
+    call_command("warm_templates")
+
+    loader = engines["django"].engine.template_loaders[0]
+    cached = set(loader.get_template_cache)
+    assert {
+        "base.html",
+        "includes/post_card.html",
+        "includes/header.html",
+        "registration/login.html",
+    } <= cached, (
+        "Убедитесь, что команда `warm_templates` компилирует шаблоны "
+        "из каталога templates/."
+    )
+    assert get_resolver()._populated, (
+        "Убедитесь, что команда `warm_templates` заполняет таблицы "
+        "маршрутов."
+    )
+    assert registry._data is not None, (
+        "Убедитесь, что команда `warm_templates` загружает справочники."
+    )
+
+
+def test_wsgi_warms_up_when_enabled(settings, monkeypatch):
+    from blog import warmup
+    from blogicum import wsgi
+
+    calls = []
+    monkeypatch.setattr(warmup, "warm_up", lambda: calls.append("warm_up"))
+    monkeypatch.setattr(
+        warmup.connections, "close_all", lambda: calls.append("close_all")
+    )
+    settings.WARM_UP_ON_START = True
+    importlib.reload(wsgi)
+    assert calls == ["warm_up", "close_all"], (
+        "Убедитесь, что при WARM_UP_ON_START процесс прогревается "
+        "в blogicum/wsgi.py, а соединения с БД затем закрываются."
+    )
+
+
+def test_ready_does_not_warm_up(settings, monkeypatch):
+    from blog import warmup
+
+    calls = []
+    monkeypatch.setattr(warmup, "warm_up", lambda: calls.append(True))
+    settings.WARM_UP_ON_START = True
+    apps.get_app_config("blog").ready()
+    assert not calls, (
+        "Убедитесь, что AppConfig.ready() не прогревает приложение: "
+        "он выполняется и для каждой команды manage.py."
+    )